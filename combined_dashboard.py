@@ -21,16 +21,15 @@ import os
 import sys
 import argparse
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # Import the ratio calculation modules
 # Make sure these are in the same directory or in your Python path
 try:
-    from profitability_ratios import fetch_financial_data as fetch_profit_data, calculate_profitability_ratios
+    from profitability_ratios import fetch_financial_data as fetch_profit_data, fetch_prices_batch, calculate_profitability_ratios
+    from ratio_utils import analysis_dates
     from liquidity_ratios import calculate_liquidity_ratios
     from solvency_ratios import calculate_solvency_ratios
     from efficiency_ratios import calculate_efficiency_ratios
@@ -71,9 +70,15 @@ def create_dashboard(ticker, period="5y", benchmark=None, market_index="^GSPC",
     
     print(f"\n===== Financial Ratio Analysis for {ticker} =====\n")
     
-    # 1. Fetch all required data
+    # 1. Fetch all required data (price history is needed for the valuation ratios)
     print("Fetching financial data...")
-    company_financial_data = fetch_profit_data(ticker, period)
+    
+    # Download prices for the company and its benchmarks in one request;
+    # a ticker missing from the batch falls back to its own download
+    start_date, end_date = analysis_dates(period)
+    prices = fetch_prices_batch([ticker, *(benchmark or [])], start_date, end_date)
+    
+    company_financial_data = fetch_profit_data(ticker, period, stock_data=prices.get(ticker), fetch_prices=True)
     company_market_data = fetch_market_data(ticker, period, market_index)
     
     # 2. Calculate all ratios
@@ -106,7 +111,7 @@ def create_dashboard(ticker, period="5y", benchmark=None, market_index="^GSPC",
     
     # Market performance ratios
     print("\n6. Market Performance Ratios:")
-    market_ratios = calculate_market_performance_ratios(company_market_data, period)
+    market_ratios = calculate_market_performance_ratios(company_market_data, ticker, period)
     print_dataframe_info(market_ratios, "Market Performance Ratios")
     
     # 3. Calculate benchmark ratios if specified
@@ -117,7 +122,7 @@ def create_dashboard(ticker, period="5y", benchmark=None, market_index="^GSPC",
             print(f"  Processing {company}...")
             try:
                 # Fetch data for benchmark company
-                company_fin_data = fetch_profit_data(company, period)
+                company_fin_data = fetch_profit_data(company, period, stock_data=prices.get(company), fetch_prices=True)
                 company_mkt_data = fetch_market_data(company, period, market_index)
                 
                 # Calculate ratios
@@ -127,7 +132,7 @@ def create_dashboard(ticker, period="5y", benchmark=None, market_index="^GSPC",
                     'solvency': calculate_solvency_ratios(company_fin_data),
                     'efficiency': calculate_efficiency_ratios(company_fin_data),
                     'valuation': calculate_valuation_ratios(company_fin_data),
-                    'market': calculate_market_performance_ratios(company_mkt_data, period)
+                    'market': calculate_market_performance_ratios(company_mkt_data, company, period)
                 }
             except Exception as e:
                 print(f"  Warning: Failed to process benchmark {company}: {e}")
@@ -139,7 +144,7 @@ def create_dashboard(ticker, period="5y", benchmark=None, market_index="^GSPC",
         try:
             # We'll only use market index data for market performance ratios
             index_data = fetch_market_data(market_index, period, market_index)
-            market_index_ratios = calculate_market_performance_ratios(index_data, period)
+            market_index_ratios = calculate_market_performance_ratios(index_data, market_index, period)
             market_index_data = {'market': market_index_ratios}
         except Exception as e:
             print(f"  Warning: Failed to process market index {market_index}: {e}")
@@ -25,7 +25,6 @@ Usage:
 import os
 import argparse
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import yfinance as yf
@@ -66,7 +65,7 @@ def fetch_financial_data(ticker, period="5y"):
         # Default to 5 years
         start_date = end_date - timedelta(days=365 * 5)
     
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = yf.download(ticker, start=start_date, end=end_date, progress=False, threads=False, auto_adjust=True, actions=False)
     
     return {
         'income_stmt': income_stmt,
@@ -75,6 +74,19 @@ def fetch_financial_data(ticker, period="5y"):
         'info': tick.info
     }
 
+def average_balance(balance_sheet, column):
+    """
+    Average a balance sheet item over each year and the adjacent one.
+    
+    Args:
+        balance_sheet: DataFrame with balance sheet items as columns
+        column: Balance sheet item to average
+    """
+    averaged = balance_sheet[column].rolling(window=2).mean()
+    # For the first year, just use the available value
+    averaged.iloc[0] = balance_sheet[column].iloc[0]
+    return averaged
+
 def calculate_efficiency_ratios(data):
     """Calculate efficiency ratios from financial data."""
     print("calculating efficiency ratio")
@@ -84,59 +96,39 @@ def calculate_efficiency_ratios(data):
     # Calculate ratios
     results = pd.DataFrame(index=income_stmt.index)
     
+    # Every ratio matches income statement dates with balance sheet dates,
+    # so derive the shared dates and revenue once
+    common_dates = income_stmt.index.intersection(balance_sheet.index)
+    if common_dates.empty:
+        print("succesfully calculated efficiency ratio")
+        return results
+    
+    has_revenue = 'Total Revenue' in income_stmt.columns
+    if has_revenue:
+        revenue = income_stmt.loc[common_dates, 'Total Revenue']
+    
     # Asset Turnover Ratio = Revenue / Average Total Assets
-    if 'Total Revenue' in income_stmt.columns and 'Total Assets' in balance_sheet.columns:
-        # Calculate average total assets for each year
-        avg_assets = balance_sheet['Total Assets'].rolling(window=2).mean()
-        # For the first year, just use the available value
-        avg_assets.iloc[0] = balance_sheet['Total Assets'].iloc[0]
-        
-        # Match income statement dates with balance sheet dates and calculate ratio
-        common_dates = income_stmt.index.intersection(avg_assets.index)
-        if not common_dates.empty:
-            results.loc[common_dates, 'Asset Turnover Ratio'] = (
-                income_stmt.loc[common_dates, 'Total Revenue'] / 
-                avg_assets.loc[common_dates]
-            )
+    if has_revenue and 'Total Assets' in balance_sheet.columns:
+        avg_assets = average_balance(balance_sheet, 'Total Assets')
+        results.loc[common_dates, 'Asset Turnover Ratio'] = revenue / avg_assets.loc[common_dates]
     
     # Inventory Turnover Ratio = Cost of Goods Sold / Average Inventory
     if 'Cost Of Revenue' in income_stmt.columns and 'Inventory' in balance_sheet.columns:
-        # Calculate average inventory for each year
-        avg_inventory = balance_sheet['Inventory'].rolling(window=2).mean()
-        # For the first year, just use the available value
-        avg_inventory.iloc[0] = balance_sheet['Inventory'].iloc[0]
+        avg_inventory = average_balance(balance_sheet, 'Inventory')
+        results.loc[common_dates, 'Inventory Turnover Ratio'] = (
+            income_stmt.loc[common_dates, 'Cost Of Revenue'] / 
+            avg_inventory.loc[common_dates]
+        )
+    
+    if has_revenue and 'Net Receivables' in balance_sheet.columns:
+        receivables = balance_sheet['Net Receivables']
         
-        # Match income statement dates with balance sheet dates and calculate ratio
-        common_dates = income_stmt.index.intersection(avg_inventory.index)
-        if not common_dates.empty:
-            results.loc[common_dates, 'Inventory Turnover Ratio'] = (
-                income_stmt.loc[common_dates, 'Cost Of Revenue'] / 
-                avg_inventory.loc[common_dates]
-            )
-    
-    # Receivables Turnover Ratio = Revenue / Average Accounts Receivable
-    if 'Total Revenue' in income_stmt.columns and 'Net Receivables' in balance_sheet.columns:
-        # Calculate average accounts receivable for each year
-        avg_receivables = balance_sheet['Net Receivables'].rolling(window=2).mean()
-        # For the first year, just use the available value
-        avg_receivables.iloc[0] = balance_sheet['Net Receivables'].iloc[0]
+        # Receivables Turnover Ratio = Revenue / Average Accounts Receivable
+        avg_receivables = average_balance(balance_sheet, 'Net Receivables')
+        results.loc[common_dates, 'Receivables Turnover Ratio'] = revenue / avg_receivables.loc[common_dates]
         
-        # Match income statement dates with balance sheet dates and calculate ratio
-        common_dates = income_stmt.index.intersection(avg_receivables.index)
-        if not common_dates.empty:
-            results.loc[common_dates, 'Receivables Turnover Ratio'] = (
-                income_stmt.loc[common_dates, 'Total Revenue'] / 
-                avg_receivables.loc[common_dates]
-            )
-    
-    # Days Sales Outstanding (DSO) = (Accounts Receivable / Revenue) * 365
-    if 'Total Revenue' in income_stmt.columns and 'Net Receivables' in balance_sheet.columns:
-        common_dates = income_stmt.index.intersection(balance_sheet.index)
-        if not common_dates.empty:
-            results.loc[common_dates, 'Days Sales Outstanding'] = (
-                balance_sheet.loc[common_dates, 'Net Receivables'] / 
-                income_stmt.loc[common_dates, 'Total Revenue']
-            ) * 365
+        # Days Sales Outstanding (DSO) = (Accounts Receivable / Revenue) * 365
+        results.loc[common_dates, 'Days Sales Outstanding'] = (receivables.loc[common_dates] / revenue) * 365
     
     print("succesfully calculated efficiency ratio")
     return results
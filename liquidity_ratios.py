@@ -24,7 +24,6 @@ Usage:
 import os
 import argparse
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import yfinance as yf
@@ -63,7 +62,7 @@ def fetch_financial_data(ticker, period="5y"):
         # Default to 5 years
         start_date = end_date - timedelta(days=365 * 5)
     
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = yf.download(ticker, start=start_date, end=end_date, progress=False, threads=False, auto_adjust=True, actions=False)
     
     return {
         'balance_sheet': balance_sheet,
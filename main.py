@@ -11,20 +11,22 @@ Usage:
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import altair as alt
 from datetime import datetime, timedelta
-import os
+import io
+import re
+import functools
 import yfinance as yf
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Import ratio calculation modules
-from profitability_ratios import calculate_profitability_ratios, fetch_financial_data as fetch_profit_data
+from profitability_ratios import calculate_profitability_ratios
 from liquidity_ratios import calculate_liquidity_ratios
 from solvency_ratios import calculate_solvency_ratios
 from efficiency_ratios import calculate_efficiency_ratios
 from valuation_ratios import calculate_valuation_ratios
-from market_performance_ratios import fetch_financial_data as fetch_market_data, calculate_market_performance_ratios
+from market_performance_ratios import calculate_market_performance_ratios
 
 # Set page configuration
 st.set_page_config(
@@ -34,168 +36,304 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load company to ticker mapping
-@st.cache_data
+# Ratios drawn as trend graphs on each tab
+TREND_RATIOS = {
+    "profitability": [
+        "Net Profit Margin (%)", 
+        "Operating Profit Margin (%)", 
+        "Return on Equity (%)", 
+        "Return on Assets (%)",
+        "Return on Capital Employed (%)"
+    ],
+    "liquidity": ["Current Ratio", "Quick Ratio"],
+    "solvency": ["Debt-to-Equity Ratio", "Interest Coverage Ratio"],
+    "efficiency": ["Asset Turnover Ratio", "Inventory Turnover Ratio", "Receivables Turnover Ratio"],
+    "valuation": ["P/E Ratio", "P/B Ratio"],
+    "market": ["Dividend Yield (%)", "Beta"]
+}
+
+# Every column a tab displays: its trend graphs plus its single-number metric
+DISPLAY_COLS = {
+    "profitability": TREND_RATIOS["profitability"] + ["EPS (₹ per share)"],
+    "liquidity": TREND_RATIOS["liquidity"] + ["Cash Ratio"],
+    "solvency": TREND_RATIOS["solvency"] + ["Debt-to-Asset Ratio"],
+    "efficiency": TREND_RATIOS["efficiency"] + ["Days Sales Outstanding"],
+    "valuation": TREND_RATIOS["valuation"] + ["EV/EBITDA"],
+    "market": TREND_RATIOS["market"] + ["Market Capitalization"]
+}
+
+# Load company to ticker mapping (shared, read-only across reruns)
+@st.cache_resource
 def load_company_ticker_map():
     try:
-        return pd.read_csv("comapny_ticker_map.csv")
+        company_df = pd.read_csv("comapny_ticker_map.csv")
     except Exception as e:
         st.error(f"Error loading company ticker map: {e}")
-        return pd.DataFrame(columns=["Company Name", "Symbol", "Industry"])
+        company_df = pd.DataFrame(columns=["Company Name", "Symbol", "Industry"])
+    
+    # Lowercase the names once so searches don't redo it on every keystroke
+    company_df["_name_lower"] = company_df["Company Name"].str.lower()
+    return company_df
 
-# Find ticker for company name with enhanced matching
-def find_ticker(company_name, company_df):
+# Build constant-time lookups from the company to ticker mapping
+@st.cache_resource
+def build_company_lookup():
+    company_df = load_company_ticker_map()
+    lookup = {
+        "name_to_symbol": dict(zip(company_df["Company Name"], company_df["Symbol"])),
+        "sorted_names": sorted(company_df["Company Name"].tolist()),
+        "names_lower": tuple(company_df["_name_lower"]),
+        "symbol_to_industry": {},
+        "industry_index": {}
+    }
+    
+    # Group companies by industry once instead of filtering on every rerun
+    if "Industry" in company_df.columns:
+        lookup["symbol_to_industry"] = dict(zip(company_df["Symbol"], company_df["Industry"]))
+        lookup["industry_index"] = company_df.groupby("Industry")["Company Name"].apply(list).to_dict()
+    
+    return lookup
+
+# Compile the word-boundary pattern for a search word once and reuse it
+@functools.lru_cache(maxsize=4096)
+def _word_pattern(word):
+    return re.compile(rf"\b{re.escape(word)}\b", re.IGNORECASE)
+
+# Match a lowercase search term against the company names, memoized per term.
+# Returns the match type, the word used for a partial match and the matching row positions.
+@functools.lru_cache(maxsize=1024)
+def _find_ticker_cached(query, names_lower):
+    names = pd.Series(names_lower, dtype=object)
+    
     # First, try exact match (case-insensitive)
-    exact_matches = company_df[company_df["Company Name"].str.lower() == company_name.lower()]
-    if not exact_matches.empty:
-        return exact_matches.iloc[0]["Symbol"], exact_matches.iloc[0]["Company Name"]
+    exact_matches = np.flatnonzero(names.to_numpy() == query)
+    if exact_matches.size:
+        return "exact", None, tuple(exact_matches[:1].tolist())
     
     # If no exact match, try contains match
-    contains_matches = company_df[company_df["Company Name"].str.contains(company_name, case=False)]
-    if not contains_matches.empty:
-        # Return the first match, but also show alternatives
-        best_match = contains_matches.iloc[0]
-        st.info(f"Using best match: {best_match['Company Name']} ({best_match['Symbol']})")
-        
-        if len(contains_matches) > 1:
-            st.info("Other possible matches:")
-            for idx, row in contains_matches.iloc[1:5].iterrows():
-                st.write(f"- {row['Company Name']} ({row['Symbol']})")
-        
-        return best_match["Symbol"], best_match["Company Name"]
+    contains_matches = np.flatnonzero(names.str.contains(query, regex=False).to_numpy())
+    if contains_matches.size:
+        return "contains", None, tuple(contains_matches[:5].tolist())
     
     # If still no match, try each word in the company name
-    words = company_name.lower().split()
-    for word in words:
+    for word in query.split():
         if len(word) > 3:  # Only use words with more than 3 characters to avoid common words
-            word_matches = company_df[company_df["Company Name"].str.lower().str.contains(word)]
-            if not word_matches.empty:
-                best_match = word_matches.iloc[0]
-                st.warning(f"No exact match found. Using partial match based on '{word}': {best_match['Company Name']} ({best_match['Symbol']})")
-                
-                if len(word_matches) > 1:
-                    st.info("Other possible matches:")
-                    for idx, row in word_matches.iloc[1:5].iterrows():
-                        st.write(f"- {row['Company Name']} ({row['Symbol']})")
-                
-                return best_match["Symbol"], best_match["Company Name"]
+            word_matches = np.flatnonzero(names.str.contains(_word_pattern(word)).to_numpy())
+            if word_matches.size:
+                return "word", word, tuple(word_matches[:5].tolist())
     
     # No match found
-    return None, None
+    return None, None, ()
 
-# Fetch financial data and calculate ratios
-@st.cache_data
-def calculate_all_ratios(ticker, period="5y"):
+# Find ticker for company name with enhanced matching
+def find_ticker(company_name, company_df):
+    names_lower = build_company_lookup()["names_lower"]
+    match_type, word, positions = _find_ticker_cached(company_name.lower(), names_lower)
+    if not positions:
+        return None, None
+    
+    matches = company_df.iloc[list(positions)]
+    best_match = matches.iloc[0]
+    if match_type == "exact":
+        return best_match["Symbol"], best_match["Company Name"]
+    
+    # Return the first match, but also show alternatives
+    if match_type == "contains":
+        st.info(f"Using best match: {best_match['Company Name']} ({best_match['Symbol']})")
+    else:
+        st.warning(f"No exact match found. Using partial match based on '{word}': {best_match['Company Name']} ({best_match['Symbol']})")
+    
+    if len(matches) > 1:
+        st.info("Other possible matches:")
+        for idx, row in matches.iloc[1:].iterrows():
+            st.write(f"- {row['Company Name']} ({row['Symbol']})")
+    
+    return best_match["Symbol"], best_match["Company Name"]
+
+# Symbols in a batched download that returned at least one price
+def downloaded_symbols(prices):
+    if prices.empty or not isinstance(prices.columns, pd.MultiIndex):
+        return set()
+    return set(prices.dropna(axis=1, how="all").columns.get_level_values(1))
+
+# One symbol's prices from a batched download, in the (Price, Ticker) column layout of a
+# single-ticker download; an empty frame with a Close column when the symbol has no prices
+def symbol_prices(prices, symbol):
+    if symbol not in downloaded_symbols(prices):
+        columns = pd.MultiIndex.from_tuples([("Close", symbol)], names=["Price", "Ticker"])
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([]), dtype=float)
+    return prices.xs(symbol, axis=1, level=1, drop_level=False).dropna(how="all")
+
+# Raised by fetch_price_history when some symbols came back without prices; it carries
+# the partial download so callers can still use it without st.cache_data keeping it
+class IncompleteDownload(Exception):
+    def __init__(self, prices, missing):
+        super().__init__(f"No price data for {', '.join(missing)}")
+        self.prices = prices
+        self.missing = missing
+
+# Download price history for several symbols in one request
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_price_history(symbols, period="5y"):
+    end_date = datetime.now()
+    if period.endswith('y'):
+        years = int(period[:-1])
+        start_date = end_date - timedelta(days=365 * years)
+    else:
+        # Default to 5 years
+        start_date = end_date - timedelta(days=365 * 5)
+    
+    # Adjusted prices, matching the downloads in the command-line ratio scripts
+    prices = yf.download(list(symbols), start=start_date, end=end_date, progress=False, auto_adjust=True)
+    
+    # yfinance reports failed symbols as empty columns rather than raising; raise instead,
+    # so st.cache_data doesn't serve the failure for the next hour
+    missing = [symbol for symbol in symbols if symbol not in downloaded_symbols(prices)]
+    if missing:
+        raise IncompleteDownload(prices, missing)
+    return prices
+
+# Fetch statements, dividends and info for a single symbol
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_statements(symbol):
+    tick = yf.Ticker(symbol)
+    statements = {
+        'income_stmt': tick.financials.T,
+        'balance_sheet': tick.balance_sheet.T,
+        'dividends': tick.dividends,
+        'info': tick.info
+    }
+    
+    # Failed requests come back as empty statements or info rather than raising; raise instead,
+    # so the failure isn't cached. Dividends may legitimately be empty, so they aren't checked.
+    if statements['income_stmt'].empty or statements['balance_sheet'].empty or not statements['info']:
+        raise ValueError(f"No financial data returned for {symbol}")
+    return statements
+
+# Fetch raw financial data for several tickers in one batch
+def fetch_all_raw(tickers, period="5y", market_ticker="^GSPC", progress_bar=None):
+    symbols = {ticker: f"{ticker}.NS" for ticker in tickers}
+    
+    # One download request covers every company and the market index
     try:
-        # Fetch data
-        company_financial_data = fetch_profit_data(ticker, period)
-        company_market_data = fetch_market_data(ticker, period, "^GSPC")
-        
-        # Calculate ratios
-        profitability = calculate_profitability_ratios(company_financial_data)
-        liquidity = calculate_liquidity_ratios(company_financial_data)
-        solvency = calculate_solvency_ratios(company_financial_data)
-        efficiency = calculate_efficiency_ratios(company_financial_data)
-        valuation = calculate_valuation_ratios(company_financial_data)
-        market = calculate_market_performance_ratios(company_market_data, ticker, period)
+        prices = fetch_price_history(tuple(symbols.values()) + (market_ticker,), period)
+    except IncompleteDownload as e:
+        # Use the prices that did arrive; the missing ones are retried on the next Analyze
+        print(f"Warning: {e}")
+        prices = e.prices
+    
+    # Every ticker's beta is measured against the market index, so report it if its prices are missing
+    market_data = symbol_prices(prices, market_ticker)
+    if market_data.empty:
+        st.error(f"Could not fetch price data for market index {market_ticker}; Beta will not be available")
+    if progress_bar:
+        progress_bar.progress(10)
+    
+    # Statements come from per-ticker endpoints, so fetch them concurrently.
+    # Worker threads get the script context so st.cache_data works off the main thread.
+    raw = {}
+    with ThreadPoolExecutor(max_workers=min(8, len(symbols)), initializer=add_script_run_ctx,
+                            initargs=(None, get_script_run_ctx())) as executor:
+        futures = {executor.submit(fetch_statements, symbols[ticker]): ticker for ticker in symbols}
+        for completed, future in enumerate(as_completed(futures), start=1):
+            ticker = futures[future]
+            if progress_bar:
+                progress_bar.progress(10 + 80 * completed // len(futures))
+            try:
+                statements = future.result()
+            except Exception as e:
+                print(f"Warning: Failed to fetch data for {ticker}: {e}")
+                continue
+            
+            # Keep the (Price, Ticker) column layout of a single-ticker download
+            raw[ticker] = {
+                **statements,
+                'stock_data': symbol_prices(prices, symbols[ticker]),
+                'market_data': market_data
+            }
+    
+    return raw
 
+# Calculate all ratio categories from a ticker's raw data
+def compute_ratios(data, ticker, period="5y"):
+    try:
         return {
-            "profitability": profitability,
-            "liquidity": liquidity,
-            "solvency": solvency,
-            "efficiency": efficiency,
-            "valuation": valuation,
-            "market": market
+            "profitability": calculate_profitability_ratios(data),
+            "liquidity": calculate_liquidity_ratios(data),
+            "solvency": calculate_solvency_ratios(data),
+            "efficiency": calculate_efficiency_ratios(data),
+            "valuation": calculate_valuation_ratios(data),
+            "market": calculate_market_performance_ratios(data, ticker, period)
         }
     except Exception as e:
         st.error(f"Error calculating ratios: {e}")
         return None
 
+# Combine all ratio categories into CSV bytes for download
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_ratio_csv(ticker, period, market_ticker, _ratios):
+    # Add a prefix to the column names to identify the category
+    frames = [
+        ratio_df.add_prefix(f"{category}_")
+        for category, ratio_df in _ratios.items()
+        if not ratio_df.empty
+    ]
+    
+    # A single outer concat builds the union index once instead of re-joining per category
+    all_ratios = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+    
+    # Write straight into a byte buffer rather than building a str and re-encoding it
+    buffer = io.BytesIO()
+    all_ratios.to_csv(buffer, encoding='utf-8')
+    return buffer.getvalue()
+
+# Latest non-missing value of a ratio column, or None if there is none
+def last_valid(ratio_df, column):
+    if column not in ratio_df.columns:
+        return None
+    
+    values = ratio_df[column].dropna()
+    try:
+        return values.iat[-1]
+    except IndexError:
+        return None
+
 # Create trend graphs for specified ratios
 def create_trend_graph(ratio_df, ratio_name):
     if ratio_df is None or ratio_name not in ratio_df.columns or ratio_df[ratio_name].isnull().all():
         return None
     
     val_arr = ratio_df[ratio_name].dropna()
-    print(val_arr)
     if not val_arr.empty:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        val_arr.plot(ax=ax, marker='o', linewidth=2)
-        plt.title(f"{ratio_name} Trend")
-        plt.ylabel(ratio_name)
-        plt.xlabel("Year")
-        plt.grid(True)
-        plt.tight_layout()
+        # Label points by fiscal year; the chart itself is rendered client-side by Vega-Lite
+        years = val_arr.index.year if isinstance(val_arr.index, pd.DatetimeIndex) else val_arr.index
+        chart_df = pd.DataFrame({"Year": years, "Value": val_arr.to_numpy()})
         
-        return fig
+        return alt.Chart(chart_df).mark_line(point=True).encode(
+            x=alt.X("Year:O", title="Year"),
+            y=alt.Y("Value:Q", title=ratio_name)
+        ).properties(title=f"{ratio_name} Trend")
     return None
 
-# Main function to run the dashboard
-def main():
-    # Sidebar
-    st.sidebar.title("Financial Ratio Analysis")
-    st.sidebar.markdown("This dashboard analyzes financial ratios for companies listed in the database.")
-    
-    # Load company mapping
-    company_df = load_company_ticker_map()
-    
-    # Company selection
-    st.sidebar.header("Company Selection")
-    
-    # Option to directly select from list or enter a name
-    selection_method = st.sidebar.radio("Select company by:", ["Company Name", "Search by Name"])
-    
-    ticker = None
-    company_name = None
-    
-    if selection_method == "Company Name":
-        # Sort company names for dropdown
-        sorted_companies = sorted(company_df["Company Name"].tolist())
-        selected_company = st.sidebar.selectbox("Select Company:", sorted_companies)
-        company_name = selected_company
-        ticker = company_df[company_df["Company Name"] == selected_company]["Symbol"].iloc[0]
-    else:
-        # Allow entering a company name
-        search_term = st.sidebar.text_input("Search for Company:")
-        if search_term:
-            ticker, company_name = find_ticker(search_term, company_df)
+# Render trend graphs for the requested ratios, two per row
+def render_trend_graphs(ratio_df, trend_ratios):
+    # Filter up front so only ratios present in the data take a grid slot
+    available = set(ratio_df.columns)
+    wanted = [ratio for ratio in trend_ratios if ratio in available]
     
-    # Analysis period selection
-    period = st.sidebar.selectbox("Select Analysis Period:", ["1y", "3y", "5y", "10y"], index=2)
-    
-    # Benchmark selection
-    st.sidebar.header("Benchmark")
-    use_benchmark = st.sidebar.checkbox("Compare with benchmark companies")
+    # Create 2 columns for graphs
+    col1, col2 = st.columns(2)
     
-    benchmark_companies = []
-    if use_benchmark and ticker:
-        # Group companies by industry
-        if "Industry" in company_df.columns:
-            company_industry = company_df[company_df["Symbol"] == ticker]["Industry"].iloc[0]
-            industry_companies = company_df[company_df["Industry"] == company_industry]["Company Name"].tolist()
-            industry_companies = [c for c in industry_companies if c != company_name]
-            
-            if industry_companies:
-                st.sidebar.markdown(f"**Industry**: {company_industry}")
-                selected_benchmarks = st.sidebar.multiselect("Select benchmark companies:", 
-                                                           industry_companies,
-                                                           max_selections=3)
-                for company in selected_benchmarks:
-                    benchmark_ticker = company_df[company_df["Company Name"] == company]["Symbol"].iloc[0]
-                    benchmark_companies.append((company, benchmark_ticker))
-            else:
-                st.sidebar.warning("No industry peers found.")
-        else:
-            st.sidebar.warning("Industry information not available in the dataset.")
-    
-    # Market index selection
-    market_index = st.sidebar.selectbox("Select Market Index:", ["^GSPC (S&P 500)", "^NSEI (Nifty 50)", "^BSESN (Sensex)"])
-    market_ticker = market_index.split()[0]
-    
-    # Main content
-    st.title("Financial Ratio Analysis Dashboard")
-    
-    if ticker and st.sidebar.button("Analyze"):
+    for i, ratio in enumerate(wanted):
+        with col1 if i % 2 == 0 else col2:
+            chart = create_trend_graph(ratio_df, ratio)
+            if chart is not None:
+                st.altair_chart(chart, use_container_width=True)
+
+# Analysis section; as a fragment, pressing Analyze reruns only this part of the page
+@st.fragment
+def render_analysis(ticker, company_name, period, benchmark_companies, market_ticker):
+    if ticker and st.button("Analyze"):
         st.write(f"## Analysis for {company_name} ({ticker})")
         
         # Show progress
@@ -203,17 +341,24 @@ def main():
         
         # Fetch data and calculate ratios
         with st.spinner("Calculating financial ratios..."):
-            ratios = calculate_all_ratios(ticker, period)
-            progress_bar.progress(50)
+            # Fetch the company, its benchmarks and the market index together;
+            # the progress bar advances as each ticker's statements arrive
+            tickers = [ticker] + [bench_ticker for _, bench_ticker in benchmark_companies]
+            raw_data = fetch_all_raw(tickers, period, market_ticker, progress_bar)
+            
+            ratios = None
+            if ticker in raw_data:
+                ratios = compute_ratios(raw_data[ticker], ticker, period)
+            else:
+                st.error(f"Could not fetch financial data for {ticker}")
             
             # Calculate benchmark ratios if selected
             benchmark_ratios = {}
-            if benchmark_companies:
-                for name, bench_ticker in benchmark_companies:
-                    try:
-                        benchmark_ratios[name] = calculate_all_ratios(bench_ticker, period)
-                    except Exception as e:
-                        st.warning(f"Could not calculate ratios for {name}: {e}")
+            for name, bench_ticker in benchmark_companies:
+                if bench_ticker in raw_data:
+                    benchmark_ratios[name] = compute_ratios(raw_data[bench_ticker], bench_ticker, period)
+                else:
+                    st.warning(f"Could not calculate ratios for {name}")
             
             progress_bar.progress(100)
         
@@ -221,6 +366,13 @@ def main():
             # Display results by category
             st.header("Financial Ratio Analysis")
             
+            # Project each category to the columns its tab displays, so the
+            # membership checks and lookups below work on narrow frames
+            display = {
+                category: ratio_df[[col for col in DISPLAY_COLS[category] if col in ratio_df.columns]]
+                for category, ratio_df in ratios.items()
+            }
+            
             # Create tabs for each category
             tab_profitability, tab_liquidity, tab_solvency, tab_efficiency, tab_valuation, tab_market = st.tabs([
                 "Profitability", "Liquidity", "Solvency", "Efficiency", "Valuation", "Market"
@@ -231,197 +383,108 @@ def main():
                 st.subheader("Profitability Ratios")
                 
                 # Trend Graphs
-                trend_ratios = [
-                    "Net Profit Margin (%)", 
-                    "Operating Profit Margin (%)", 
-                    "Return on Equity (%)", 
-                    "Return on Assets (%)",
-                    "Return on Capital Employed (%)"
-                ]
-                
-                # Create 2 columns for graphs
-                col1, col2 = st.columns(2)
-                
-                for i, ratio in enumerate(trend_ratios):
-                    if ratio in ratios["profitability"].columns:
-                        print(f"ratio: {ratio}")
-                        with col1 if i % 2 == 0 else col2:
-                            fig = create_trend_graph(ratios["profitability"], ratio)
-                            if fig:
-                                st.pyplot(fig)
+                render_trend_graphs(display["profitability"], TREND_RATIOS["profitability"])
                 
                 # Single Numbers
                 st.subheader("Key Metrics")
                 metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
                 
-                if "EPS (₹ per share)" in ratios["profitability"].columns:
+                eps_value = last_valid(display["profitability"], "EPS (₹ per share)")
+                if eps_value is not None:
                     with metrics_col1:
-                        eps_value = ratios["profitability"]["EPS (₹ per share)"].iloc[-1]
-                        if not pd.isna(eps_value):
-                            st.metric("Earnings Per Share (₹)", f"₹{eps_value:.2f}")
+                        st.metric("Earnings Per Share (₹)", f"₹{eps_value:.2f}")
             
             # Liquidity Ratios
             with tab_liquidity:
                 st.subheader("Liquidity Ratios")
                 
                 # Trend Graphs
-                trend_ratios = ["Current Ratio", "Quick Ratio"]
-                
-                # Create 2 columns for graphs
-                col1, col2 = st.columns(2)
-                
-                for i, ratio in enumerate(trend_ratios):
-                    if ratio in ratios["liquidity"].columns:
-                        with col1 if i % 2 == 0 else col2:
-                            fig = create_trend_graph(ratios["liquidity"], ratio)
-                            if fig:
-                                st.pyplot(fig)
+                render_trend_graphs(display["liquidity"], TREND_RATIOS["liquidity"])
                 
                 # Single Numbers
                 st.subheader("Key Metrics")
                 metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
                 
-                if "Cash Ratio" in ratios["liquidity"].columns:
+                cash_ratio = last_valid(display["liquidity"], "Cash Ratio")
+                if cash_ratio is not None:
                     with metrics_col1:
-                        cash_ratio = ratios["liquidity"]["Cash Ratio"].iloc[-1]
-                        if not pd.isna(cash_ratio):
-                            st.metric("Cash Ratio", f"{cash_ratio:.2f}")
+                        st.metric("Cash Ratio", f"{cash_ratio:.2f}")
             
             # Solvency Ratios
             with tab_solvency:
                 st.subheader("Solvency Ratios")
                 
                 # Trend Graphs
-                trend_ratios = ["Debt-to-Equity Ratio", "Interest Coverage Ratio"]
-                
-                # Create 2 columns for graphs
-                col1, col2 = st.columns(2)
-                
-                for i, ratio in enumerate(trend_ratios):
-                    if ratio in ratios["solvency"].columns:
-                        with col1 if i % 2 == 0 else col2:
-                            fig = create_trend_graph(ratios["solvency"], ratio)
-                            if fig:
-                                st.pyplot(fig)
+                render_trend_graphs(display["solvency"], TREND_RATIOS["solvency"])
                 
                 # Single Numbers
                 st.subheader("Key Metrics")
                 metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
                 
-                if "Debt-to-Asset Ratio" in ratios["solvency"].columns:
+                debt_asset = last_valid(display["solvency"], "Debt-to-Asset Ratio")
+                if debt_asset is not None:
                     with metrics_col1:
-                        debt_asset = ratios["solvency"]["Debt-to-Asset Ratio"].iloc[-1]
-                        if not pd.isna(debt_asset):
-                            st.metric("Debt-to-Asset Ratio", f"{debt_asset:.2f}")
+                        st.metric("Debt-to-Asset Ratio", f"{debt_asset:.2f}")
             
             # Efficiency Ratios
             with tab_efficiency:
                 st.subheader("Efficiency Ratios")
                 
                 # Trend Graphs
-                trend_ratios = ["Asset Turnover Ratio", "Inventory Turnover Ratio", "Receivables Turnover Ratio"]
-                
-                # Create 2 columns for graphs
-                col1, col2 = st.columns(2)
-                
-                for i, ratio in enumerate(trend_ratios):
-                    if ratio in ratios["efficiency"].columns:
-                        with col1 if i % 2 == 0 else col2:
-                            fig = create_trend_graph(ratios["efficiency"], ratio)
-                            if fig:
-                                st.pyplot(fig)
+                render_trend_graphs(display["efficiency"], TREND_RATIOS["efficiency"])
                 
                 # Single Numbers
                 st.subheader("Key Metrics")
                 metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
                 
-                if "Days Sales Outstanding" in ratios["efficiency"].columns:
+                dso = last_valid(display["efficiency"], "Days Sales Outstanding")
+                if dso is not None:
                     with metrics_col1:
-                        dso = ratios["efficiency"]["Days Sales Outstanding"].iloc[-1]
-                        if not pd.isna(dso):
-                            st.metric("Days Sales Outstanding", f"{dso:.2f}")
+                        st.metric("Days Sales Outstanding", f"{dso:.2f}")
             
             # Valuation Ratios
             with tab_valuation:
                 st.subheader("Valuation Ratios")
                 
                 # Trend Graphs
-                trend_ratios = ["P/E Ratio", "P/B Ratio"]
-                
-                # Create 2 columns for graphs
-                col1, col2 = st.columns(2)
-                
-                for i, ratio in enumerate(trend_ratios):
-                    if ratio in ratios["valuation"].columns:
-                        with col1 if i % 2 == 0 else col2:
-                            fig = create_trend_graph(ratios["valuation"], ratio)
-                            if fig:
-                                st.pyplot(fig)
+                render_trend_graphs(display["valuation"], TREND_RATIOS["valuation"])
                 
                 # Single Numbers
                 st.subheader("Key Metrics")
                 metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
                 
-                if "EV/EBITDA" in ratios["valuation"].columns:
+                ev_ebitda = last_valid(display["valuation"], "EV/EBITDA")
+                if ev_ebitda is not None:
                     with metrics_col1:
-                        ev_ebitda = ratios["valuation"]["EV/EBITDA"].iloc[-1]
-                        if not pd.isna(ev_ebitda):
-                            st.metric("EV/EBITDA", f"{ev_ebitda:.2f}")
+                        st.metric("EV/EBITDA", f"{ev_ebitda:.2f}")
             
             # Market Performance Ratios
             with tab_market:
                 st.subheader("Market Performance Ratios")
                 
                 # Trend Graphs
-                trend_ratios = ["Dividend Yield (%)", "Beta"]
-                
-                # Create 2 columns for graphs
-                col1, col2 = st.columns(2)
-                
-                for i, ratio in enumerate(trend_ratios):
-                    if ratio in ratios["market"].columns:
-                        with col1 if i % 2 == 0 else col2:
-                            fig = create_trend_graph(ratios["market"], ratio)
-                            if fig:
-                                st.pyplot(fig)
+                render_trend_graphs(display["market"], TREND_RATIOS["market"])
                 
                 # Single Numbers
                 st.subheader("Key Metrics")
                 metrics_col1, metrics_col2, metrics_col3 = st.columns(3)
                 
-                if "Market Capitalization" in ratios["market"].columns:
-                    market_cap = ratios["market"]["Market Capitalization"].iloc[-1]
-                    if not pd.isna(market_cap):
-                        if market_cap >= 1_000_000_000:
-                            formatted_cap = f"${market_cap/1_000_000_000:.2f}B"
-                        elif market_cap >= 1_000_000:
-                            formatted_cap = f"${market_cap/1_000_000:.2f}M"
-                        else:
-                            formatted_cap = f"${market_cap:.2f}"
-                        with metrics_col1:
-                            st.metric("Market Capitalization", formatted_cap)
+                market_cap = last_valid(display["market"], "Market Capitalization")
+                if market_cap is not None:
+                    if market_cap >= 1_000_000_000:
+                        formatted_cap = f"${market_cap/1_000_000_000:.2f}B"
+                    elif market_cap >= 1_000_000:
+                        formatted_cap = f"${market_cap/1_000_000:.2f}M"
+                    else:
+                        formatted_cap = f"${market_cap:.2f}"
+                    with metrics_col1:
+                        st.metric("Market Capitalization", formatted_cap)
             
             # Download button for all ratios
             st.header("Download Data")
             
-            # Combine all ratios into a single DataFrame
-            all_ratios = pd.DataFrame()
-            
-            for category, ratio_df in ratios.items():
-                if not ratio_df.empty:
-                    # Add a prefix to the column names to identify the category
-                    prefixed_df = ratio_df.copy()
-                    prefixed_df.columns = [f"{category}_{col}" for col in prefixed_df.columns]
-                    
-                    # Merge with all_ratios
-                    if all_ratios.empty:
-                        all_ratios = prefixed_df
-                    else:
-                        # Use the index of all_ratios and join
-                        all_ratios = all_ratios.join(prefixed_df, how='outer')
-            
             # Convert to CSV for download
-            csv = all_ratios.to_csv().encode('utf-8')
+            csv = build_ratio_csv(ticker, period, market_ticker, ratios)
             
             st.download_button(
                 label="Download Ratio Data as CSV",
@@ -432,7 +495,7 @@ def main():
             
     else:
         # Show instructions when no company is selected
-        st.info("To get started, select a company from the sidebar and click 'Analyze'.")
+        st.info("To get started, select a company from the sidebar and click 'Analyze' above.")
         
         # Show description
         st.markdown("""
@@ -477,5 +540,72 @@ def main():
         - Market Capitalization
         """)
 
+# Main function to run the dashboard
+def main():
+    # Sidebar
+    st.sidebar.title("Financial Ratio Analysis")
+    st.sidebar.markdown("This dashboard analyzes financial ratios for companies listed in the database.")
+    
+    # Load company mapping
+    company_df = load_company_ticker_map()
+    lookup = build_company_lookup()
+    name_to_symbol = lookup["name_to_symbol"]
+    
+    # Company selection
+    st.sidebar.header("Company Selection")
+    
+    # Option to directly select from list or enter a name
+    selection_method = st.sidebar.radio("Select company by:", ["Company Name", "Search by Name"])
+    
+    ticker = None
+    company_name = None
+    
+    if selection_method == "Company Name":
+        # Company names are sorted once when the lookup is built
+        selected_company = st.sidebar.selectbox("Select Company:", lookup["sorted_names"])
+        company_name = selected_company
+        ticker = name_to_symbol[selected_company]
+    else:
+        # Allow entering a company name
+        search_term = st.sidebar.text_input("Search for Company:")
+        if search_term:
+            ticker, company_name = find_ticker(search_term, company_df)
+    
+    # Analysis period selection
+    period = st.sidebar.selectbox("Select Analysis Period:", ["1y", "3y", "5y", "10y"], index=2)
+    
+    # Benchmark selection
+    st.sidebar.header("Benchmark")
+    use_benchmark = st.sidebar.checkbox("Compare with benchmark companies")
+    
+    benchmark_companies = []
+    if use_benchmark and ticker:
+        # Group companies by industry
+        if "Industry" in company_df.columns:
+            company_industry = lookup["symbol_to_industry"][ticker]
+            industry_companies = [c for c in lookup["industry_index"].get(company_industry, []) if c != company_name]
+            
+            if industry_companies:
+                st.sidebar.markdown(f"**Industry**: {company_industry}")
+                selected_benchmarks = st.sidebar.multiselect("Select benchmark companies:", 
+                                                           industry_companies,
+                                                           max_selections=3)
+                for company in selected_benchmarks:
+                    benchmark_ticker = name_to_symbol[company]
+                    benchmark_companies.append((company, benchmark_ticker))
+            else:
+                st.sidebar.warning("No industry peers found.")
+        else:
+            st.sidebar.warning("Industry information not available in the dataset.")
+    
+    # Market index selection
+    market_index = st.sidebar.selectbox("Select Market Index:", ["^GSPC (S&P 500)", "^NSEI (Nifty 50)", "^BSESN (Sensex)"])
+    market_ticker = market_index.split()[0]
+    
+    # Main content
+    st.title("Financial Ratio Analysis Dashboard")
+    
+    render_analysis(ticker, company_name, period, benchmark_companies, market_ticker)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -19,20 +19,31 @@ Usage:
     Optional arguments:
         --market_index: Market index for comparison (default: ^GSPC for S&P 500)
         --output: Output directory for saving visualizations (default: ./output)
+        --force: Recalculate ratios even if results were already saved today
 """
 
 import os
 import argparse
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import yfinance as yf
+import yf_cache
+from ratio_utils import get_pyplot
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-# Set plotting style
-sns.set_theme(style="whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
+__all__ = [
+    "parse_arguments",
+    "fetch_financial_data",
+    "year_end_last",
+    "calculate_rolling_beta",
+    "calculate_market_performance_ratios",
+    "ratio_cache_path",
+    "load_saved_ratios",
+    "save_ratios",
+    "plot_trend_graphs",
+    "display_single_numbers",
+]
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -41,14 +52,24 @@ def parse_arguments():
     parser.add_argument("--period", default="5y", help="Analysis period (e.g., 5y for 5 years)")
     parser.add_argument("--market_index", default="^GSPC", help="Market index for comparison")
     parser.add_argument("--output", default="./output", help="Output directory for saving visualizations")
+    parser.add_argument("--force", action="store_true", help="Recalculate ratios even if saved results exist for today")
     return parser.parse_args()
 
+# Ticker info is the slowest yfinance endpoint; memoize it and the dividend history
+# per symbol for the life of the process, on top of the disk cache
+@lru_cache(maxsize=1024)
+def _info(symbol):
+    return yf_cache.info(symbol)
+
+@lru_cache(maxsize=1024)
+def _divs(symbol):
+    return yf_cache.dividends(symbol)
+
 def fetch_financial_data(ticker, period="5y", market_index="^GSPC"):
     """Fetch financial data for a given ticker."""
     print("fetching market data")
     # Get the ticker object
     ticker = f"{ticker}.NS"
-    tick = yf.Ticker(ticker)
     
     # Get stock price data for the period
     end_date = datetime.now()
@@ -59,24 +80,83 @@ def fetch_financial_data(ticker, period="5y", market_index="^GSPC"):
         # Default to 5 years
         start_date = end_date - timedelta(days=365 * 5)
     
-    # Get both the company stock data and market index data
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
-    market_data = yf.download(market_index, start=start_date, end=end_date)
+    # Dividend history and info are separate requests; run them alongside the price download
+    # (everything is served from the local yfinance cache when a fresh copy exists)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        dividends_future = executor.submit(_divs, ticker)
+        info_future = executor.submit(_info, ticker)
+        
+        # Get both the company stock data and market index data in one batched download
+        prices = yf_cache.download([ticker, market_index], start_date, end_date, progress=False)
+        stock_data = prices.xs(ticker, axis=1, level=1, drop_level=False).dropna(how="all")
+        market_data = prices.xs(market_index, axis=1, level=1, drop_level=False).dropna(how="all")
+        
+        # A failed dividend fetch leaves the yield at zero rather than aborting the analysis
+        try:
+            dividends = dividends_future.result()
+        except Exception as e:
+            print(f"Warning: Failed to fetch dividends for {ticker}: {e}")
+            dividends = pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+        info = info_future.result()
     
-    # Get dividend history
-    try:
-        dividends = tick.dividends
-    except:
-        dividends = pd.Series(dtype=float)
+    # Only the requested period is used downstream; drop the older payout history
+    dividends = dividends.loc[start_date.date().isoformat():end_date.date().isoformat()]
     
     print("succesfully fetched market data")
     return {
         'stock_data': stock_data,
         'market_data': market_data,
         'dividends': dividends,
-        'info': tick.info
+        'info': info
     }
 
+def year_end_last(series):
+    """
+    Take the last value of each calendar year present in a series.
+    
+    Unlike resample('YE'), years without observations are skipped rather than
+    filled with empty bins.
+    
+    Args:
+        series: Series with a DatetimeIndex
+        
+    Returns:
+        Series indexed by the year-end date of each year
+    """
+    yearly = series.groupby(series.index.year).last()
+    yearly.index = pd.to_datetime(yearly.index.astype(str) + '-12-31')
+    return yearly
+
+def calculate_rolling_beta(stock_returns, market_returns, window):
+    """
+    Calculate rolling beta in a single pass over windowed running sums.
+    
+    Args:
+        stock_returns: Array of stock returns
+        market_returns: Array of market returns aligned with stock_returns
+        window: Number of observations in each rolling window
+        
+    Returns:
+        Array of beta values, NaN until the first full window
+    """
+    stock_returns = np.ascontiguousarray(stock_returns, dtype=np.float64)
+    market_returns = np.ascontiguousarray(market_returns, dtype=np.float64)
+    
+    def window_sums(values):
+        cumulative = np.concatenate(([0.0], np.cumsum(values)))
+        return cumulative[window:] - cumulative[:-window]
+    
+    sum_stock = window_sums(stock_returns)
+    sum_market = window_sums(market_returns)
+    sum_cross = window_sums(stock_returns * market_returns)
+    sum_market_sq = window_sums(market_returns * market_returns)
+    
+    # The 1/(window - 1) factors of covariance and variance cancel in the ratio
+    beta = np.full(len(stock_returns), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta[window - 1:] = (sum_cross - sum_stock * sum_market / window) / (sum_market_sq - sum_market ** 2 / window)
+    return beta
+
 def calculate_market_performance_ratios(data, ticker, period="5y"):
     """Calculate market performance ratios from financial data."""
     print("calculating market performance ratios")
@@ -85,58 +165,49 @@ def calculate_market_performance_ratios(data, ticker, period="5y"):
     dividends = data['dividends']
     info = data['info']
     
-    dividends.index = dividends.index.to_pydatetime()
-    dividends.index = dividends.index.tz_localize(None)
+    # Drop the exchange timezone so dividend dates line up with the tz-naive price index.
+    # tz_localize returns a new Series, leaving the caller's (possibly cached) one untouched.
+    if dividends.index.tz is not None:
+        dividends = dividends.tz_localize(None)
 
-    # Calculate ratios
-    results = pd.DataFrame()
+    # Closing prices; yfinance returns them as a one-column frame per ticker
+    close = stock_data['Close']
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
     
-    # For yearly analysis, resample to yearly frequency
-    stock_yearly = stock_data.resample('YE').last()
+    # For yearly analysis, keep the last closing price of each year
+    yearly_close = year_end_last(close)
     
     # Dividend Yield (%) = (Annual Dividend Per Share / Stock Price) * 100
-    # Calculate historical dividend yield
-    dividend_yield = pd.DataFrame(index=stock_yearly.index, columns=['Dividend Yield (%)'])
-    for year in stock_yearly.index:
-        # Get dividends for the year
-        print(f"year: {year}")
-        year_start = datetime(year.year, 1, 1)
-        year_end = datetime(year.year, 12, 31)
-        
-        # Filter dividends for the year
-        year_dividends = dividends[(dividends.index >= year_start) & (dividends.index <= year_end)]
-        # Calculate annual dividend
-        annual_dividend = year_dividends.sum()
-        # Calculate dividend yield
-        if annual_dividend > 0:
-            year = year.strftime('%Y-%m-%d')
-            if (ticker, year) in stock_yearly.index:
-                stock_price = stock_yearly.loc[(ticker, year), 'Close']
-                dividend_yield.loc[year, 'Dividend Yield (%)'] = (annual_dividend / stock_price) * 100
-        else:
-            dividend_yield.loc[year, 'Dividend Yield (%)'] = 0
-    # Beta (Stock Volatility)
-    # Calculate rolling beta using 1-year windows with 3-month steps
-
-    returns = stock_data['Close'].pct_change().dropna()
-    market_returns = market_data['Close'].pct_change().dropna()
+    # Sum dividends per calendar year once and divide by the year-end prices
+    annual_dividends = dividends.groupby(dividends.index.year).sum()
+    annual_dividends = annual_dividends.reindex(yearly_close.index.year, fill_value=0).to_numpy()
+    dividend_yield = (annual_dividends / yearly_close * 100).to_frame('Dividend Yield (%)')
     
-    
-    # Combine returns into a single DataFrame and align dates
-    stock_returns = returns.iloc[:, 0]
-    market_returns = market_returns.iloc[:, 0]
-    combined_returns = pd.DataFrame({'stock': stock_returns, 'market': market_returns})
-    combined_returns = combined_returns.dropna()
-    
-    # Calculate rolling beta
-    window_size = 252  # Approximately 1 year of trading days
-    rolling_cov = combined_returns['stock'].rolling(window=window_size).cov(combined_returns['market'])
-    rolling_var = combined_returns['market'].rolling(window=window_size).var()
-    rolling_beta = rolling_cov / rolling_var
-    
-    # Resample to yearly for the chart
-    beta_yearly = rolling_beta.resample('YE').last()
-    beta_df = pd.DataFrame(beta_yearly, columns=['Beta'])
+    # Beta (Stock Volatility)
+    if stock_data is market_data or stock_data.equals(market_data):
+        # A series measured against itself has a beta of exactly 1; skip the rolling computation
+        beta_df = pd.DataFrame({'Beta': 1.0}, index=yearly_close.index)
+    else:
+        # Calculate rolling beta using 1-year windows with 3-month steps
+        market_close = market_data['Close']
+        if isinstance(market_close, pd.DataFrame):
+            market_close = market_close.iloc[:, 0]
+        
+        # Align both closing price series on their common dates once, then take returns in one pass
+        prices = pd.concat([close, market_close], axis=1, join='inner', keys=['stock', 'market']).dropna()
+        combined_returns = prices.pct_change().dropna()
+        
+        # Calculate rolling beta
+        window_size = 252  # Approximately 1 year of trading days
+        rolling_beta = pd.Series(
+            calculate_rolling_beta(combined_returns['stock'].to_numpy(), combined_returns['market'].to_numpy(), window_size),
+            index=combined_returns.index
+        )
+        
+        # Reduce to yearly values for the chart
+        beta_yearly = year_end_last(rolling_beta)
+        beta_df = pd.DataFrame(beta_yearly, columns=['Beta'])
     
     # Current Market Capitalization
     market_cap = info.get('marketCap', np.nan)
@@ -149,6 +220,26 @@ def calculate_market_performance_ratios(data, ticker, period="5y"):
 
     return results
 
+def ratio_cache_path(ticker, period, market_index=None, output_dir="./output"):
+    """
+    Return the CSV path where today's market performance ratios for a ticker are saved.
+    
+    Beta depends on the index it is measured against, so the index is part of the name.
+    """
+    index_key = market_index.lstrip('^') if market_index else "noindex"
+    return os.path.join(output_dir, f"{ticker.lstrip('^')}_{period}_vs_{index_key}_{datetime.now():%Y%m%d}_market_ratios.csv")
+
+def load_saved_ratios(path):
+    """Load ratios saved by an earlier run, or None if there are none."""
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+def save_ratios(ratios, path):
+    """Save calculated ratios so later runs today can skip recalculating them."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    ratios.to_csv(path)
+
 def plot_trend_graphs(company_ratios, market_ratios=None, output_dir="./output"):
     """
     Plot trend graphs for specified ratios.
@@ -158,15 +249,20 @@ def plot_trend_graphs(company_ratios, market_ratios=None, output_dir="./output")
         market_ratios: DataFrame with market average ratios
         output_dir: Directory to save the plots
     """
+    plt = get_pyplot()
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     # List of ratios to plot as trend graphs
     trend_ratios = ['Dividend Yield (%)', 'Beta']
     
+    # Reuse one figure for every ratio, clearing the axes between saves
+    fig, ax = plt.subplots(figsize=(12, 8))
+    
     for ratio in trend_ratios:
         if ratio in company_ratios.columns:
-            fig, ax = plt.subplots(figsize=(12, 8))
+            ax.clear()
             
             # Plot company data
             company_ratios[ratio].plot(ax=ax, marker='o', label=f"Company")
@@ -175,15 +271,16 @@ def plot_trend_graphs(company_ratios, market_ratios=None, output_dir="./output")
             if market_ratios is not None and ratio in market_ratios.columns:
                 market_ratios[ratio].plot(ax=ax, linestyle='-.', color='black', label="Market Average")
             
-            plt.title(f"{ratio} Trend (Past 5 Years)")
-            plt.ylabel(ratio)
-            plt.xlabel("Year")
-            plt.legend()
-            plt.tight_layout()
+            ax.set_title(f"{ratio} Trend (Past 5 Years)")
+            ax.set_ylabel(ratio)
+            ax.set_xlabel("Year")
+            ax.legend()
+            fig.tight_layout()
             
             # Save the plot
-            plt.savefig(os.path.join(output_dir, f"{ratio.replace(' ', '_').replace('(%)', 'Pct')}.png"))
-            plt.close()
+            fig.savefig(os.path.join(output_dir, f"{ratio.replace(' ', '_').replace('(%)', 'Pct')}.png"))
+    
+    plt.close(fig)
 
 def display_single_numbers(company_ratios, market_ratios=None):
     """
@@ -215,7 +312,11 @@ def display_single_numbers(company_ratios, market_ratios=None):
     
     # Format market cap in billions
     latest_df = latest_df / 1_000_000_000
-    latest_df = latest_df.applymap(lambda x: f"${x:.2f}B" if pd.notna(x) else "N/A")
+    values = latest_df.to_numpy()
+    formatted = np.array(
+        [f"${x:.2f}B" if pd.notna(x) else "N/A" for x in values.ravel()], dtype=object
+    ).reshape(values.shape)
+    latest_df = pd.DataFrame(formatted, index=latest_df.index, columns=latest_df.columns)
     
     print("\nSingle Number Ratios (Latest Values):")
     print(latest_df)
@@ -228,26 +329,35 @@ def main():
     
     print(f"\nAnalyzing market performance ratios for {args.ticker}...")
     
-    # Fetch data for the main company
-    company_data = fetch_financial_data(args.ticker, args.period, args.market_index)
-    company_ratios = calculate_market_performance_ratios(company_data, args.period)
+    # Reuse ratios saved by an earlier run today unless --force is given
+    company_path = ratio_cache_path(args.ticker, args.period, args.market_index, args.output)
+    market_path = ratio_cache_path(args.market_index, args.period, args.market_index, args.output) if args.market_index else None
+    company_ratios = None if args.force else load_saved_ratios(company_path)
+    market_ratios = None if args.force or not market_path else load_saved_ratios(market_path)
     
-    # Fetch market index data (for benchmarking)
-    market_data = None
-    market_ratios = None
-    if args.market_index:
-        print(f"Fetching data for market index: {args.market_index}")
-        try:
-            market_tick = yf.Ticker(args.market_index)
-            market_info = {
-                'stock_data': company_data['market_data'],  # Use the already fetched market data
-                'market_data': company_data['market_data'],  # Same data for correlation with itself
-                'dividends': market_tick.dividends,
-                'info': market_tick.info
-            }
-            market_ratios = calculate_market_performance_ratios(market_info, args.period)
-        except Exception as e:
-            print(f"Warning: Failed to calculate market ratios: {e}")
+    if company_ratios is not None and (market_ratios is not None or not args.market_index):
+        print("Using ratios saved earlier today (pass --force to recalculate)")
+    else:
+        # Fetch data for the main company
+        company_data = fetch_financial_data(args.ticker, args.period, args.market_index)
+        company_ratios = calculate_market_performance_ratios(company_data, args.ticker, args.period)
+        save_ratios(company_ratios, company_path)
+        
+        # Fetch market index data (for benchmarking)
+        market_ratios = None
+        if args.market_index:
+            print(f"Fetching data for market index: {args.market_index}")
+            try:
+                market_info = {
+                    'stock_data': company_data['market_data'],  # Use the already fetched market data
+                    'market_data': company_data['market_data'],  # Same data for correlation with itself
+                    'dividends': _divs(args.market_index),
+                    'info': _info(args.market_index)
+                }
+                market_ratios = calculate_market_performance_ratios(market_info, args.market_index, args.period)
+                save_ratios(market_ratios, market_path)
+            except Exception as e:
+                print(f"Warning: Failed to calculate market ratios: {e}")
     
     # Plot trend graphs
     print("Generating trend graphs...")
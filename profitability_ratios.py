@@ -23,20 +23,17 @@ Usage:
         --benchmark: List of peer companies for benchmarking
         --market_index: Market index for comparison (default: ^GSPC for S&P 500)
         --output: Output directory for saving visualizations (default: ./output)
+        --force: Recalculate ratios even if results were already saved today
 """
 
 import os
 import argparse
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import yfinance as yf
-from datetime import datetime, timedelta
-
-# Set plotting style
-sns.set_theme(style="whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
+import yf_cache
+from ratio_utils import get_pyplot, analysis_dates, safe_divide, latest_single_numbers
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -46,39 +43,72 @@ def parse_arguments():
     parser.add_argument("--benchmark", nargs="+", default=[], help="List of peer companies for benchmarking")
     parser.add_argument("--market_index", default="^GSPC", help="Market index for comparison")
     parser.add_argument("--output", default="./output", help="Output directory for saving visualizations")
+    parser.add_argument("--force", action="store_true", help="Recalculate ratios even if saved results exist for today")
     return parser.parse_args()
 
-def fetch_financial_data(ticker, period="5y"):
-    """Fetch financial data for a given ticker."""
-    # Get the ticker object
+def fetch_prices_batch(tickers, start_date, end_date):
+    """
+    Download price history for several tickers in a single request.
+    
+    Args:
+        tickers: List of company ticker symbols
+        start_date: Start of the price range
+        end_date: End of the price range
+        
+    Returns:
+        Dictionary mapping each ticker to its price DataFrame, or None if no prices came back
+    """
+    if not tickers:
+        return {}
+    
+    symbols = {ticker: f"{ticker}.NS" for ticker in tickers}
+    prices = yf_cache.download(
+        list(symbols.values()), start_date, end_date, threads=True, progress=False, auto_adjust=True, actions=False
+    )
+    
+    # Split the (Price, Ticker) columns back into one frame per ticker, shaped like a single download
+    downloaded = set(prices.columns.get_level_values(1)) if not prices.empty else set()
+    return {
+        ticker: prices.xs(symbol, axis=1, level=1, drop_level=False).dropna(how="all")
+        if symbol in downloaded else None
+        for ticker, symbol in symbols.items()
+    }
+
+def fetch_financial_data(ticker, period="5y", stock_data=None, fetch_prices=False):
+    """
+    Fetch financial data for a given ticker.
+    
+    The profitability ratios only need the statements and info, so price history is
+    left out unless fetch_prices is set or already-downloaded stock_data is passed in.
+    """
     print("fetching financial data")
     ticker = f"{ticker}.NS"
-    tick = yf.Ticker(ticker)
-    
-    # Fetch financial statements
-    income_stmt = tick.financials
-    balance_sheet = tick.balance_sheet
-    
-    # Transpose to have dates as index
-    income_stmt = income_stmt.T
-    balance_sheet = balance_sheet.T
-    
-    # Get stock price data for the period
-    end_date = datetime.now()
-    if period.endswith('y'):
-        years = int(period[:-1])
-        start_date = end_date - timedelta(days=365 * years)
-    else:
-        # Default to 5 years
-        start_date = end_date - timedelta(days=365 * 5)
-    
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    
+    # Fetch financial statements and info; each is a separate request, so run them concurrently
+    # (served from the local yfinance cache when a fresh copy exists)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        income_future = executor.submit(yf_cache.financials, ticker)
+        balance_future = executor.submit(yf_cache.balance_sheet, ticker)
+        info_future = executor.submit(yf_cache.info, ticker)
+        
+        # Get stock price data for the period, when asked for
+        if stock_data is None and fetch_prices:
+            start_date, end_date = analysis_dates(period)
+            stock_data = yf_cache.download(
+                ticker, start_date, end_date, progress=False, threads=False, auto_adjust=True, actions=False
+            )
+        
+        # Transpose to have dates as index
+        income_stmt = income_future.result().T
+        balance_sheet = balance_future.result().T
+        info = info_future.result()
+    
     print("succesfully fetched financial data")
     return {
         'income_stmt': income_stmt,
         'balance_sheet': balance_sheet,
         'stock_data': stock_data,
-        'info': tick.info
+        'info': info
     }
 
 def calculate_profitability_ratios(data):
@@ -87,40 +117,86 @@ def calculate_profitability_ratios(data):
     income_stmt = data['income_stmt']
     balance_sheet = data['balance_sheet']
     
-    # Calculate ratios
-    results = pd.DataFrame(index=income_stmt.index)
+    # Align the balance sheet to the income statement dates once rather than in every division
+    balance_sheet = balance_sheet.reindex(income_stmt.index)
+    
+    # Look up each statement line once; None marks a line missing from the statement
+    income_cols = set(income_stmt.columns)
+    balance_cols = set(balance_sheet.columns)
+    net_income = income_stmt['Net Income'] if 'Net Income' in income_cols else None
+    revenue = income_stmt['Total Revenue'] if 'Total Revenue' in income_cols else None
+    operating_income = income_stmt['Operating Income'] if 'Operating Income' in income_cols else None
+    equity = balance_sheet['Total Stockholder Equity'] if 'Total Stockholder Equity' in balance_cols else None
+    total_assets = balance_sheet['Total Assets'] if 'Total Assets' in balance_cols else None
+    current_liabilities = balance_sheet['Total Current Liabilities'] if 'Total Current Liabilities' in balance_cols else None
+    
+    # Collect the numerator and denominator of each percentage ratio, then divide them all at once
+    numerators = {}
+    denominators = {}
     
     # Net Profit Margin (%) = (Net Income / Total Revenue) * 100
-    if 'Net Income' in income_stmt.columns and 'Total Revenue' in income_stmt.columns:
-        results['Net Profit Margin (%)'] = (income_stmt['Net Income'] / income_stmt['Total Revenue']) * 100
+    if net_income is not None and revenue is not None:
+        numerators['Net Profit Margin (%)'] = net_income
+        denominators['Net Profit Margin (%)'] = revenue
     
     # Operating Profit Margin (%) = (Operating Income / Total Revenue) * 100
-    if 'Operating Income' in income_stmt.columns and 'Total Revenue' in income_stmt.columns:
-        results['Operating Profit Margin (%)'] = (income_stmt['Operating Income'] / income_stmt['Total Revenue']) * 100
+    if operating_income is not None and revenue is not None:
+        numerators['Operating Profit Margin (%)'] = operating_income
+        denominators['Operating Profit Margin (%)'] = revenue
     
     # Return on Equity (ROE) (%) = (Net Income / Total Stockholder Equity) * 100
-    if 'Net Income' in income_stmt.columns and 'Total Stockholder Equity' in balance_sheet.columns:
-        results['Return on Equity (%)'] = (income_stmt['Net Income'] / balance_sheet['Total Stockholder Equity']) * 100
+    if net_income is not None and equity is not None:
+        numerators['Return on Equity (%)'] = net_income
+        denominators['Return on Equity (%)'] = equity
     
     # Return on Assets (ROA) (%) = (Net Income / Total Assets) * 100
-    if 'Net Income' in income_stmt.columns and 'Total Assets' in balance_sheet.columns:
-        results['Return on Assets (%)'] = (income_stmt['Net Income'] / balance_sheet['Total Assets']) * 100
+    if net_income is not None and total_assets is not None:
+        numerators['Return on Assets (%)'] = net_income
+        denominators['Return on Assets (%)'] = total_assets
     
     # Return on Capital Employed (ROCE) (%)
     # ROCE = EBIT / Capital Employed
     # Capital Employed = Total Assets - Current Liabilities
-    if ('Operating Income' in income_stmt.columns and 
-        'Total Assets' in balance_sheet.columns and 
-        'Total Current Liabilities' in balance_sheet.columns):
-        ebit = income_stmt['Operating Income']  # EBIT is often reported as Operating Income
-        capital_employed = balance_sheet['Total Assets'] - balance_sheet['Total Current Liabilities']
-        results['Return on Capital Employed (%)'] = (ebit / capital_employed) * 100
+    if operating_income is not None and total_assets is not None and current_liabilities is not None:
+        numerators['Return on Capital Employed (%)'] = operating_income  # EBIT is often reported as Operating Income
+        denominators['Return on Capital Employed (%)'] = total_assets - current_liabilities
+    
+    num_df = pd.DataFrame(numerators, index=income_stmt.index)
+    den_df = pd.DataFrame(denominators, index=income_stmt.index)
+    results = safe_divide(num_df, den_df) * 100
     
     # Earnings Per Share (EPS)
     results['EPS (₹ per share)'] = data['info'].get('trailingEPS', np.nan)
+    
     print("succesfully calculated profitability ratios")
     return results
 
+def ratio_cache_path(ticker, period, output_dir="./output"):
+    """Return the CSV path where today's profitability ratios for a ticker are saved."""
+    return os.path.join(output_dir, f"{ticker.lstrip('^')}_{period}_{datetime.now():%Y%m%d}_profitability_ratios.csv")
+
+def get_profitability_ratios(ticker, period="5y", output_dir="./output", force=False):
+    """
+    Load today's saved profitability ratios for a ticker, or fetch and calculate them.
+    
+    Args:
+        ticker: Company ticker symbol
+        period: Analysis period (e.g., 5y for 5 years)
+        output_dir: Directory holding the saved ratios
+        force: Recalculate even if saved ratios exist
+        
+    Returns:
+        DataFrame with profitability ratios
+    """
+    path = ratio_cache_path(ticker, period, output_dir)
+    if not force and os.path.exists(path):
+        return pd.read_csv(path, index_col=0, parse_dates=True)
+    
+    ratios = calculate_profitability_ratios(fetch_financial_data(ticker, period))
+    os.makedirs(output_dir, exist_ok=True)
+    ratios.to_csv(path)
+    return ratios
+
 def plot_trend_graphs(company_ratios, benchmark_ratios=None, market_ratios=None, output_dir="./output"):
     """
     Plot trend graphs for specified ratios.
@@ -131,6 +207,8 @@ def plot_trend_graphs(company_ratios, benchmark_ratios=None, market_ratios=None,
         market_ratios: DataFrame with market average ratios
         output_dir: Directory to save the plots
     """
+    plt = get_pyplot()
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
@@ -143,9 +221,12 @@ def plot_trend_graphs(company_ratios, benchmark_ratios=None, market_ratios=None,
         'Return on Capital Employed (%)'
     ]
     
+    # Reuse one figure for every ratio, clearing the axes between saves
+    fig, ax = plt.subplots(figsize=(12, 8))
+    
     for ratio in trend_ratios:
         if ratio in company_ratios.columns:
-            fig, ax = plt.subplots(figsize=(12, 8))
+            ax.clear()
             
             # Plot company data
             company_ratios[ratio].plot(ax=ax, marker='o', label=f"Company")
@@ -160,15 +241,16 @@ def plot_trend_graphs(company_ratios, benchmark_ratios=None, market_ratios=None,
             if market_ratios is not None and ratio in market_ratios.columns:
                 market_ratios[ratio].plot(ax=ax, linestyle='-.', color='black', label="Market Average")
             
-            plt.title(f"{ratio} Trend (Past 5 Years)")
-            plt.ylabel(ratio)
-            plt.xlabel("Year")
-            plt.legend()
-            plt.tight_layout()
+            ax.set_title(f"{ratio} Trend (Past 5 Years)")
+            ax.set_ylabel(ratio)
+            ax.set_xlabel("Year")
+            ax.legend()
+            fig.tight_layout()
             
             # Save the plot
-            plt.savefig(os.path.join(output_dir, f"{ratio.replace(' ', '_').replace('(%)', 'Pct')}.png"))
-            plt.close()
+            fig.savefig(os.path.join(output_dir, f"{ratio.replace(' ', '_').replace('(%)', 'Pct')}.png"))
+    
+    plt.close(fig)
 
 def display_single_numbers(company_ratios, benchmark_ratios=None, market_ratios=None):
     """
@@ -182,29 +264,13 @@ def display_single_numbers(company_ratios, benchmark_ratios=None, market_ratios=
     # List of ratios to display as single numbers
     single_ratios = ['EPS (₹ per share)']
     
-    # Create a table for the latest values
-    latest_values = {}
-    
-    # Get the latest value for the company
-    for ratio in single_ratios:
-        if ratio in company_ratios.columns:
-            latest_values['Company'] = company_ratios[ratio].iloc[-1]
-    
-    # Get the latest values for benchmark companies
-    if benchmark_ratios:
-        for company, ratios in benchmark_ratios.items():
-            for ratio in single_ratios:
-                if ratio in ratios.columns:
-                    latest_values[company] = ratios[ratio].iloc[-1]
-    
-    # Get the market average
+    # Gather the company, benchmarks and market average and take each one's latest values
+    sources = {'Company': company_ratios, **(benchmark_ratios or {})}
     if market_ratios is not None:
-        for ratio in single_ratios:
-            if ratio in market_ratios.columns:
-                latest_values['Market Average'] = market_ratios[ratio].iloc[-1]
+        sources['Market Average'] = market_ratios
+    latest_df = latest_single_numbers(sources, single_ratios)
     
     # Display as a DataFrame
-    latest_df = pd.DataFrame(latest_values, index=single_ratios)
     print("\nSingle Number Ratios (Latest Values):")
     print(latest_df)
     
@@ -216,27 +282,36 @@ def main():
     
     print(f"\nAnalyzing profitability ratios for {args.ticker}...")
     
-    # Fetch data for the main company
-    company_data = fetch_financial_data(args.ticker, args.period)
-    company_ratios = calculate_profitability_ratios(company_data)
-    
-    # Fetch data for benchmark companies
-    benchmark_ratios = {}
-    for benchmark in args.benchmark:
-        print(f"Fetching data for benchmark company: {benchmark}")
-        benchmark_data = fetch_financial_data(benchmark, args.period)
-        benchmark_ratios[benchmark] = calculate_profitability_ratios(benchmark_data)
-    
-    # Fetch market index data
-    market_data = None
-    market_ratios = None
-    if args.market_index:
-        print(f"Fetching data for market index: {args.market_index}")
-        try:
-            market_data = fetch_financial_data(args.market_index, args.period)
-            market_ratios = calculate_profitability_ratios(market_data)
-        except Exception as e:
-            print(f"Warning: Failed to fetch market index data: {e}")
+    # Fetch the company, benchmarks and market index concurrently; each fetch is network-bound
+    # (ratios saved earlier today are reused unless --force is given)
+    # A ticker listed twice (e.g. as its own benchmark) is fetched once, so no two threads write the same saved file
+    tickers = list(dict.fromkeys([args.ticker, *args.benchmark] + ([args.market_index] if args.market_index else [])))
+    with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as executor:
+        futures = {
+            ticker: executor.submit(get_profitability_ratios, ticker, args.period, args.output, args.force)
+            for ticker in tickers
+        }
+        
+        # Data for the main company
+        company_ratios = futures[args.ticker].result()
+        
+        # Data for benchmark companies
+        benchmark_ratios = {}
+        for benchmark in args.benchmark:
+            print(f"Fetching data for benchmark company: {benchmark}")
+            try:
+                benchmark_ratios[benchmark] = futures[benchmark].result()
+            except Exception as e:
+                print(f"Warning: Failed to fetch benchmark data for {benchmark}: {e}")
+        
+        # Market index data
+        market_ratios = None
+        if args.market_index:
+            print(f"Fetching data for market index: {args.market_index}")
+            try:
+                market_ratios = futures[args.market_index].result()
+            except Exception as e:
+                print(f"Warning: Failed to fetch market index data: {e}")
     
     # Plot trend graphs
     print("Generating trend graphs...")
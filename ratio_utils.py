@@ -0,0 +1,71 @@
+"""
+Shared Ratio Helpers
+
+Small helpers used by several of the ratio scripts, so each one is defined
+in a single place.
+
+Usage:
+    from ratio_utils import analysis_dates
+    start_date, end_date = analysis_dates("5y")
+"""
+
+import pandas as pd
+
+def analysis_dates(period="5y"):
+    """Return the start and end dates for an analysis period, in calendar years."""
+    end_date = pd.Timestamp.now()
+    years = int(period[:-1]) if period.endswith('y') else 5  # Default to 5 years
+    return end_date - pd.DateOffset(years=years), end_date
+
+def safe_divide(numerator, denominator):
+    """
+    Divide aligned Series or DataFrames, leaving NaN where the denominator is zero.
+
+    Args:
+        numerator: Series or DataFrame of numerator values
+        denominator: Series or DataFrame of denominator values with matching labels
+
+    Returns:
+        Quotients with the same shape as the inputs
+    """
+    return numerator / denominator.where(denominator != 0)
+
+def latest_single_numbers(sources, single_ratios):
+    """
+    Take the latest value of each single-number ratio for every source.
+
+    Args:
+        sources: Dictionary mapping a source name (company, benchmark, market) to its ratio DataFrame
+        single_ratios: List of ratio columns to report
+
+    Returns:
+        DataFrame with one row per ratio and one column per source that reports any of them
+    """
+    frames = {
+        name: ratios.reindex(columns=single_ratios)
+        for name, ratios in sources.items()
+        if not set(single_ratios).isdisjoint(ratios.columns)
+    }
+    if not frames:
+        return pd.DataFrame(index=single_ratios)
+
+    # Stack them once and take every source's latest row in a single groupby
+    stacked = pd.concat(frames, names=['Source'])
+    return stacked.groupby(level='Source', sort=False).tail(1).droplevel(1).T
+
+# matplotlib is only needed for plotting, so it is imported and styled on first use
+_plt_inited = False
+
+def get_pyplot():
+    """Import pyplot and set the plotting style the first time it is needed."""
+    global _plt_inited
+    if not _plt_inited:
+        # Plots are only saved to files, so use the non-interactive backend
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    if not _plt_inited:
+        plt.style.use("seaborn-v0_8-whitegrid")
+        plt.rcParams['figure.figsize'] = (12, 8)
+        _plt_inited = True
+    return plt
@@ -24,15 +24,9 @@ Usage:
 import os
 import argparse
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import yfinance as yf
-from datetime import datetime, timedelta
-
-# Set plotting style
-sns.set_theme(style="whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
+import yf_cache
+from ratio_utils import get_pyplot, analysis_dates, safe_divide, latest_single_numbers
+from concurrent.futures import ThreadPoolExecutor
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -43,35 +37,38 @@ def parse_arguments():
     parser.add_argument("--output", default="./output", help="Output directory for saving visualizations")
     return parser.parse_args()
 
-def fetch_financial_data(ticker, period="5y"):
-    """Fetch financial data for a given ticker."""
-    # Get the ticker object
-    tick = yf.Ticker(ticker)
-    
-    # Fetch financial statements
-    income_stmt = tick.financials
-    balance_sheet = tick.balance_sheet
-    
-    # Transpose to have dates as index
-    income_stmt = income_stmt.T
-    balance_sheet = balance_sheet.T
-    
-    # Get stock price data for the period
-    end_date = datetime.now()
-    if period.endswith('y'):
-        years = int(period[:-1])
-        start_date = end_date - timedelta(days=365 * years)
-    else:
-        # Default to 5 years
-        start_date = end_date - timedelta(days=365 * 5)
+def fetch_financial_data(ticker, period="5y", fetch_prices=False):
+    """
+    Fetch financial data for a given ticker.
     
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    The solvency ratios only need the statements and info, so price history is
+    left out unless fetch_prices is set.
+    """
+    # Fetch financial statements and info; each is a separate request, so run them concurrently
+    # (served from the local yfinance cache when a fresh copy exists)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        income_future = executor.submit(yf_cache.financials, ticker)
+        balance_future = executor.submit(yf_cache.balance_sheet, ticker)
+        info_future = executor.submit(yf_cache.info, ticker)
+        
+        # Get stock price data for the period, when asked for
+        stock_data = None
+        if fetch_prices:
+            start_date, end_date = analysis_dates(period)
+            stock_data = yf_cache.download(
+                ticker, start_date, end_date, progress=False, threads=False, auto_adjust=True, actions=False
+            )
+        
+        # Transpose to have dates as index
+        income_stmt = income_future.result().T
+        balance_sheet = balance_future.result().T
+        info = info_future.result()
     
     return {
         'income_stmt': income_stmt,
         'balance_sheet': balance_sheet,
         'stock_data': stock_data,
-        'info': tick.info
+        'info': info
     }
 
 def calculate_solvency_ratios(data):
@@ -80,35 +77,37 @@ def calculate_solvency_ratios(data):
     income_stmt = data['income_stmt']
     balance_sheet = data['balance_sheet']
     
+    # Align the income statement to the balance sheet dates once rather than in every division
+    income_stmt = income_stmt.reindex(balance_sheet.index)
+    
+    # Compute column membership once
+    income_cols = set(income_stmt.columns)
+    balance_cols = set(balance_sheet.columns)
+    
+    # Total Debt often includes both short-term and long-term debt;
+    # use Long Term Debt if available, otherwise Total Debt
+    if 'Long Term Debt' in balance_cols:
+        debt = balance_sheet['Long Term Debt']
+    elif 'Total Debt' in balance_cols:
+        debt = balance_sheet['Total Debt']
+    else:
+        debt = None
+    
     # Calculate ratios
     results = pd.DataFrame(index=balance_sheet.index)
     
     # Debt-to-Equity (D/E) Ratio = Total Debt / Shareholders' Equity
-    # Note: Total Debt often includes both short-term and long-term debt
-    if ('Long Term Debt' in balance_sheet.columns and 
-        'Total Stockholder Equity' in balance_sheet.columns):
-        # Use Long Term Debt if available
-        results['Debt-to-Equity Ratio'] = balance_sheet['Long Term Debt'] / balance_sheet['Total Stockholder Equity']
-    elif ('Total Debt' in balance_sheet.columns and 
-          'Total Stockholder Equity' in balance_sheet.columns):
-        # Use Total Debt if available
-        results['Debt-to-Equity Ratio'] = balance_sheet['Total Debt'] / balance_sheet['Total Stockholder Equity']
+    if debt is not None and 'Total Stockholder Equity' in balance_cols:
+        results['Debt-to-Equity Ratio'] = safe_divide(debt, balance_sheet['Total Stockholder Equity'])
     
     # Interest Coverage Ratio = EBIT / Interest Expense
-    if ('Operating Income' in income_stmt.columns and 
-        'Interest Expense' in income_stmt.columns):
+    if 'Operating Income' in income_cols and 'Interest Expense' in income_cols:
         # EBIT is often reported as Operating Income
-        results['Interest Coverage Ratio'] = income_stmt['Operating Income'] / abs(income_stmt['Interest Expense'])
+        results['Interest Coverage Ratio'] = safe_divide(income_stmt['Operating Income'], income_stmt['Interest Expense'].abs())
     
     # Debt-to-Asset Ratio = Total Debt / Total Assets
-    if ('Long Term Debt' in balance_sheet.columns and 
-        'Total Assets' in balance_sheet.columns):
-        # Use Long Term Debt if available
-        results['Debt-to-Asset Ratio'] = balance_sheet['Long Term Debt'] / balance_sheet['Total Assets']
-    elif ('Total Debt' in balance_sheet.columns and 
-          'Total Assets' in balance_sheet.columns):
-        # Use Total Debt if available
-        results['Debt-to-Asset Ratio'] = balance_sheet['Total Debt'] / balance_sheet['Total Assets']
+    if debt is not None and 'Total Assets' in balance_cols:
+        results['Debt-to-Asset Ratio'] = safe_divide(debt, balance_sheet['Total Assets'])
     
     print("succesfully calculated solvency ratio")
     return results
@@ -122,6 +121,8 @@ def plot_trend_graphs(company_ratios, benchmark_ratios=None, output_dir="./outpu
         benchmark_ratios: Dictionary of DataFrames with benchmark companies' ratios
         output_dir: Directory to save the plots
     """
+    plt = get_pyplot()
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
@@ -162,23 +163,10 @@ def display_single_numbers(company_ratios, benchmark_ratios=None):
     # List of ratios to display as single numbers
     single_ratios = ['Debt-to-Asset Ratio']
     
-    # Create a table for the latest values
-    latest_values = {}
-    
-    # Get the latest value for the company
-    for ratio in single_ratios:
-        if ratio in company_ratios.columns:
-            latest_values['Company'] = company_ratios[ratio].iloc[-1]
-    
-    # Get the latest values for benchmark companies
-    if benchmark_ratios:
-        for company, ratios in benchmark_ratios.items():
-            for ratio in single_ratios:
-                if ratio in ratios.columns:
-                    latest_values[company] = ratios[ratio].iloc[-1]
+    # Take the latest values for the company and each benchmark
+    latest_df = latest_single_numbers({'Company': company_ratios, **(benchmark_ratios or {})}, single_ratios)
     
     # Display as a DataFrame
-    latest_df = pd.DataFrame(latest_values, index=single_ratios)
     print("\nSingle Number Ratios (Latest Values):")
     print(latest_df)
     
@@ -190,16 +178,25 @@ def main():
     
     print(f"\nAnalyzing solvency ratios for {args.ticker}...")
     
-    # Fetch data for the main company
-    company_data = fetch_financial_data(args.ticker, args.period)
-    company_ratios = calculate_solvency_ratios(company_data)
-    
-    # Fetch data for benchmark companies
-    benchmark_ratios = {}
-    for benchmark in args.benchmark:
-        print(f"Fetching data for benchmark company: {benchmark}")
-        benchmark_data = fetch_financial_data(benchmark, args.period)
-        benchmark_ratios[benchmark] = calculate_solvency_ratios(benchmark_data)
+    # Fetch the company and benchmarks concurrently; each fetch is network-bound
+    tickers = [args.ticker, *args.benchmark]
+    with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as executor:
+        futures = {ticker: executor.submit(fetch_financial_data, ticker, args.period) for ticker in tickers}
+        
+        # Data for the main company
+        company_data = futures[args.ticker].result()
+        company_ratios = calculate_solvency_ratios(company_data)
+        
+        # Data for benchmark companies
+        benchmark_ratios = {}
+        for benchmark in args.benchmark:
+            print(f"Fetching data for benchmark company: {benchmark}")
+            try:
+                benchmark_data = futures[benchmark].result()
+            except Exception as e:
+                print(f"Warning: Failed to fetch benchmark data for {benchmark}: {e}")
+                continue
+            benchmark_ratios[benchmark] = calculate_solvency_ratios(benchmark_data)
     
     # Plot trend graphs
     print("Generating trend graphs...")
@@ -0,0 +1,14 @@
+"""
+Shared HTTP session for the yfinance test scripts.
+
+When requests_cache is installed, Yahoo responses are cached on disk for a day,
+so re-running the scripts reads them locally instead of going back to the network.
+Without it, SESSION is None and yfinance falls back to its own session.
+"""
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+SESSION = requests_cache.CachedSession("yf_http_cache", expire_after=24 * 60 * 60) if requests_cache else None
@@ -1,4 +1,5 @@
 import yfinance as yf
+from _session import SESSION
 
 def get_market_cap(ticker):
     """
@@ -6,7 +7,7 @@ def get_market_cap(ticker):
     If it's a stock, calculate Market Cap = Close Price * Outstanding Shares.
     If it's an index, return Close Price as a proxy for growth.
     """
-    stock = yf.Ticker(ticker)
+    stock = yf.Ticker(ticker, session=SESSION)
     history = stock.history(period="10y")  # Get last 10 years of data
     
     if "NSEI" in ticker or "NSEBANK" in ticker:  # If it's an index, return Close Price
@@ -39,16 +40,16 @@ nifty_index = get_market_cap(nifty_ticker)
 bank_nifty_index = get_market_cap(bank_nifty_ticker)
 
 # Get initial and final values for CAGR calculation
-initial_hdfc_mc = hdfc_market_cap.iloc[0]['Market Cap']
-final_hdfc_mc = hdfc_market_cap.iloc[-1]['Market Cap']
+initial_hdfc_mc = hdfc_market_cap['Market Cap'].iat[0]
+final_hdfc_mc = hdfc_market_cap['Market Cap'].iat[-1]
 hdfc_cagr = calculate_cagr(initial_hdfc_mc, final_hdfc_mc)
 
-initial_nifty_value = nifty_index.iloc[0]['Value']
-final_nifty_value = nifty_index.iloc[-1]['Value']
+initial_nifty_value = nifty_index['Value'].iat[0]
+final_nifty_value = nifty_index['Value'].iat[-1]
 nifty_cagr = calculate_cagr(initial_nifty_value, final_nifty_value)
 
-initial_bank_nifty_value = bank_nifty_index.iloc[0]['Value']
-final_bank_nifty_value = bank_nifty_index.iloc[-1]['Value']
+initial_bank_nifty_value = bank_nifty_index['Value'].iat[0]
+final_bank_nifty_value = bank_nifty_index['Value'].iat[-1]
 bank_nifty_cagr = calculate_cagr(initial_bank_nifty_value, final_bank_nifty_value)
 
 # Print Results
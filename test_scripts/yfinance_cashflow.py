@@ -1,14 +1,12 @@
 import yfinance as yf
-import pandas as pd
-import json
-import numpy as np
+from _session import SESSION
 
 def fetch_cashflow_statement(ticker):
     """
     Fetches the cash flow statement of a company from Yahoo Finance.
     Stores it in a JSON file where each year is a key and NaN values are replaced with null.
     """
-    stock = yf.Ticker(ticker)
+    stock = yf.Ticker(ticker, session=SESSION)
     
     # Fetch Cash Flow Statement
     cashflow = stock.cashflow
@@ -23,16 +21,9 @@ def fetch_cashflow_statement(ticker):
     # Convert index (dates) to string format for JSON compatibility
     cashflow.index = cashflow.index.strftime("%Y")
 
-    # Convert NaN values to None (null in JSON)
-    cashflow = cashflow.where(pd.notna(cashflow), None)
-
-    # Convert to dictionary where each year is a key
-    cashflow_dict = cashflow.to_dict(orient="index")
-
-    # Save to JSON file
+    # Save to JSON file with each year as a key
     filename = f"{ticker}_cashflow.json"
-    with open(filename, "w") as f:
-        json.dump(cashflow_dict, f, indent=4)
+    cashflow.to_json(filename, orient="index", indent=4, double_precision=15)
 
     print(f"Cash flow statement saved to {filename}")
 
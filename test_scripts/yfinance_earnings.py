@@ -1,13 +1,12 @@
 import yfinance as yf
-import pandas as pd
-import json
+from _session import SESSION
 
 def fetch_yearly_earnings(ticker):
     """
     Fetches the yearly earnings (income statement) of a company from Yahoo Finance.
     Stores it in a JSON file where each year is a key and NaN values are replaced with null.
     """
-    stock = yf.Ticker(ticker)
+    stock = yf.Ticker(ticker, session=SESSION)
     
     # Fetch Income Statement (Yearly Earnings)
     earnings = stock.financials
@@ -22,16 +21,9 @@ def fetch_yearly_earnings(ticker):
     # Convert index (dates) to string format for JSON compatibility
     earnings.index = earnings.index.strftime("%Y")
 
-    # Convert NaN values to None (null in JSON)
-    earnings = earnings.where(pd.notna(earnings), None)
-
-    # Convert to dictionary where each year is a key
-    earnings_dict = earnings.to_dict(orient="index")
-
-    # Save to JSON file
+    # Save to JSON file with each year as a key
     filename = f"{ticker}_earnings.json"
-    with open(filename, "w") as f:
-        json.dump(earnings_dict, f, indent=4)
+    earnings.to_json(filename, orient="index", indent=4, double_precision=15)
 
     print(f"Yearly earnings saved to {filename}")
 
@@ -1,10 +1,11 @@
 import yfinance as yf
+from _session import SESSION
 
 # Define ticker
 ticker = "ZOMATO.NS"  # Example: Zomato
 
 # Fetch sustainability data
-stock = yf.Ticker(ticker)
+stock = yf.Ticker(ticker, session=SESSION)
 sustainability = stock.sustainability
 
 # Print sustainability scores
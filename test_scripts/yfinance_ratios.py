@@ -1,7 +1,8 @@
 import yfinance as yf
+from _session import SESSION
 
 # Example: Fetch financial data for Reliance Industries (RELIANCE.NS)
-ticker = yf.Ticker("ASIANPAINT.NS")
+ticker = yf.Ticker("ASIANPAINT.NS", session=SESSION)
 
 # Fetch different financial ratios
 debt_to_equity = ticker.info.get('debtToEquity')
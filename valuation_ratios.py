@@ -26,14 +26,9 @@ import os
 import argparse
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import yfinance as yf
 from datetime import datetime, timedelta
-
-# Set plotting style
-sns.set_theme(style="whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
+from concurrent.futures import ThreadPoolExecutor
+from ratio_utils import get_pyplot, latest_single_numbers
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -47,12 +42,12 @@ def parse_arguments():
 
 def fetch_financial_data(ticker, period="5y"):
     """Fetch financial data for a given ticker."""
-    # Get the ticker object
-    tick = yf.Ticker(ticker)
+    # yf_cache pulls in yfinance, so it is imported only when data is actually fetched
+    import yf_cache
     
-    # Fetch financial statements
-    income_stmt = tick.financials
-    balance_sheet = tick.balance_sheet
+    # Fetch financial statements (served from the local yfinance cache when a fresh copy exists)
+    income_stmt = yf_cache.financials(ticker)
+    balance_sheet = yf_cache.balance_sheet(ticker)
     
     # Transpose to have dates as index
     income_stmt = income_stmt.T
@@ -67,15 +62,29 @@ def fetch_financial_data(ticker, period="5y"):
         # Default to 5 years
         start_date = end_date - timedelta(days=365 * 5)
     
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = yf_cache.download(ticker, start_date, end_date, progress=False, threads=False, auto_adjust=True, actions=False)
     
     return {
         'income_stmt': income_stmt,
         'balance_sheet': balance_sheet,
         'stock_data': stock_data,
-        'info': tick.info
+        'info': yf_cache.info(ticker)
     }
 
+def divide_arrays(numerator, denominator):
+    """
+    Element-wise division of two float arrays.
+    
+    Args:
+        numerator: Array of numerators
+        denominator: Array of denominators, the same shape as numerator
+    
+    Returns:
+        Array of quotients, NaN where either input is missing or the denominator is zero
+    """
+    mask = ~np.isnan(numerator) & ~np.isnan(denominator) & (denominator != 0)
+    return np.divide(numerator, denominator, out=np.full_like(numerator, np.nan), where=mask)
+
 def calculate_valuation_ratios(data):
     """Calculate valuation ratios from financial data."""
     print("calculating valuation ratios")
@@ -84,56 +93,63 @@ def calculate_valuation_ratios(data):
     stock_data = data['stock_data']
     info = data['info']
     
-    # Calculate ratios
-    results = pd.DataFrame()
+    # Outstanding shares turn statement totals into per-share values for P/E and P/B
+    # Note: In a real-world scenario, you would need historical shares outstanding
+    # Here we'll use the current shares outstanding as an approximation
+    shares_outstanding = info.get('sharesOutstanding', None)
     
     # For historical P/E and P/B ratios, we need to align stock prices with financial statement dates
     fin_dates = income_stmt.index
-    yearly_stock_prices = {}
     
-    for date in fin_dates:
-        # Find closest stock price to financial date
-        closest_date = stock_data.index[stock_data.index <= date][-1]
-        yearly_stock_prices[date] = stock_data.loc[closest_date, 'Close']
+    # Ratio columns, gathered here and turned into a frame in one step at the end
+    ratios = {}
     
-    # Create a DataFrame with historical stock prices
-    price_df = pd.Series(yearly_stock_prices, name='Stock Price').to_frame()
-    
-    # Add dates as index
-    results = pd.DataFrame(index=fin_dates)
-    
-    # Price-to-Earnings (P/E) Ratio = Stock Price / Earnings Per Share
-    if 'Net Income' in income_stmt.columns and 'Stock Price' in price_df.columns:
-        # Get outstanding shares for each period
-        # Note: In a real-world scenario, you would need historical shares outstanding
-        # Here we'll use the current shares outstanding as an approximation
-        shares_outstanding = info.get('sharesOutstanding', None)
+    # Without a share count (indexes, some funds) there are no per-share ratios, so skip the price alignment
+    if shares_outstanding:
+        # Closing prices; yfinance returns them as a one-column frame per ticker
+        close = stock_data['Close']
+        if isinstance(close, pd.DataFrame):
+            close = close.iloc[:, 0]
+        
+        # Find the last closing price on or before every financial date in one backward asof-merge.
+        # Both keys are cast to nanoseconds because merge_asof rejects mismatched datetime resolutions.
+        fd = pd.DataFrame({'date': pd.to_datetime(fin_dates).astype('datetime64[ns]')}).sort_values('date')
+        close_df = close.rename('Stock Price').rename_axis('Date').reset_index().sort_values('Date')
+        close_df['Date'] = close_df['Date'].astype('datetime64[ns]')
         
-        if shares_outstanding:
-            # Calculate historical EPS
-            income_stmt['EPS'] = income_stmt['Net Income'] / shares_outstanding
+        # Create a DataFrame with historical stock prices
+        price_df = pd.merge_asof(fd, close_df, left_on='date', right_on='Date', direction='backward').set_index('date')[['Stock Price']]
+        
+        # Closing price on each financial date, shared by both ratios
+        prices = price_df['Stock Price'].reindex(fin_dates).to_numpy(dtype=np.float64)
+        
+        # Price-to-Earnings (P/E) Ratio = Stock Price / Earnings Per Share
+        if 'Net Income' in income_stmt.columns:
+            # Calculate historical EPS for every financial date in one array
+            eps = income_stmt['Net Income'].reindex(fin_dates).to_numpy(dtype=np.float64) / shares_outstanding
             
             # Calculate P/E ratio
-            results['P/E Ratio'] = price_df['Stock Price'] / income_stmt['EPS']
-    
-    # Price-to-Book (P/B) Ratio = Stock Price / Book Value Per Share
-    if 'Total Stockholder Equity' in balance_sheet.columns and 'Stock Price' in price_df.columns:
-        # Get outstanding shares for each period
-        shares_outstanding = info.get('sharesOutstanding', None)
+            ratios['P/E Ratio'] = divide_arrays(prices, eps)
         
-        if shares_outstanding:
-            # Calculate historical Book Value Per Share
-            balance_sheet['Book Value Per Share'] = balance_sheet['Total Stockholder Equity'] / shares_outstanding
+        # Price-to-Book (P/B) Ratio = Stock Price / Book Value Per Share
+        if 'Total Stockholder Equity' in balance_sheet.columns:
+            # Calculate historical Book Value Per Share for every financial date in one array
+            bvps = balance_sheet['Total Stockholder Equity'].reindex(fin_dates).to_numpy(dtype=np.float64) / shares_outstanding
             
             # Calculate P/B ratio
-            results['P/B Ratio'] = price_df['Stock Price'] / balance_sheet['Book Value Per Share']
+            ratios['P/B Ratio'] = divide_arrays(prices, bvps)
     
     # Enterprise Value to EBITDA (EV/EBITDA)
     # This is typically calculated using current market data rather than historical
     # We'll use the trailing EV/EBITDA from the info object
-    results['EV/EBITDA'] = info.get('enterpriseToEbitda', np.nan)
-    results = results.reset_index()
-    results.columns = results.columns.map('_'.join)
+    ratios['EV/EBITDA'] = info.get('enterpriseToEbitda', np.nan)
+    
+    # Build the results with dates as index, without inserting columns one at a time
+    results = pd.DataFrame(ratios, index=fin_dates)
+    
+    # Flatten column names only if they come out as tuples; plain names are kept as they are
+    if isinstance(results.columns, pd.MultiIndex):
+        results.columns = ['_'.join(map(str, col)).strip('_') for col in results.columns]
     print("succesfully calculated valuation ratios")
     return results
 
@@ -147,15 +163,20 @@ def plot_trend_graphs(company_ratios, benchmark_ratios=None, market_ratios=None,
         market_ratios: DataFrame with market average ratios
         output_dir: Directory to save the plots
     """
+    plt = get_pyplot()
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     # List of ratios to plot as trend graphs
     trend_ratios = ['P/E Ratio', 'P/B Ratio']
     
+    # Reuse one figure for every ratio, clearing the axes between saves
+    fig, ax = plt.subplots(figsize=(12, 8))
+    
     for ratio in trend_ratios:
         if ratio in company_ratios.columns:
-            fig, ax = plt.subplots(figsize=(12, 8))
+            ax.clear()
             
             # Plot company data
             company_ratios[ratio].plot(ax=ax, marker='o', label=f"Company")
@@ -170,15 +191,16 @@ def plot_trend_graphs(company_ratios, benchmark_ratios=None, market_ratios=None,
             if market_ratios is not None and ratio in market_ratios.columns:
                 market_ratios[ratio].plot(ax=ax, linestyle='-.', color='black', label="Market Average")
             
-            plt.title(f"{ratio} Trend (Past 5 Years)")
-            plt.ylabel(ratio)
-            plt.xlabel("Year")
-            plt.legend()
-            plt.tight_layout()
+            ax.set_title(f"{ratio} Trend (Past 5 Years)")
+            ax.set_ylabel(ratio)
+            ax.set_xlabel("Year")
+            ax.legend()
+            fig.tight_layout()
             
             # Save the plot
-            plt.savefig(os.path.join(output_dir, f"{ratio.replace(' ', '_').replace('/', '_')}.png"))
-            plt.close()
+            fig.savefig(os.path.join(output_dir, f"{ratio.replace(' ', '_').replace('/', '_')}.png"))
+    
+    plt.close(fig)
 
 def display_single_numbers(company_ratios, benchmark_ratios=None):
     """
@@ -191,23 +213,10 @@ def display_single_numbers(company_ratios, benchmark_ratios=None):
     # List of ratios to display as single numbers
     single_ratios = ['EV/EBITDA']
     
-    # Create a table for the latest values
-    latest_values = {}
-    
-    # Get the latest value for the company
-    for ratio in single_ratios:
-        if ratio in company_ratios.columns:
-            latest_values['Company'] = company_ratios[ratio].iloc[-1]
-    
-    # Get the latest values for benchmark companies
-    if benchmark_ratios:
-        for company, ratios in benchmark_ratios.items():
-            for ratio in single_ratios:
-                if ratio in ratios.columns:
-                    latest_values[company] = ratios[ratio].iloc[-1]
+    # Take the latest values for the company and each benchmark
+    latest_df = latest_single_numbers({'Company': company_ratios, **(benchmark_ratios or {})}, single_ratios)
     
     # Display as a DataFrame
-    latest_df = pd.DataFrame(latest_values, index=single_ratios)
     print("\nSingle Number Ratios (Latest Values):")
     print(latest_df)
     
@@ -219,27 +228,34 @@ def main():
     
     print(f"\nAnalyzing valuation ratios for {args.ticker}...")
     
-    # Fetch data for the main company
-    company_data = fetch_financial_data(args.ticker, args.period)
-    company_ratios = calculate_valuation_ratios(company_data)
-    
-    # Fetch data for benchmark companies
-    benchmark_ratios = {}
-    for benchmark in args.benchmark:
-        print(f"Fetching data for benchmark company: {benchmark}")
-        benchmark_data = fetch_financial_data(benchmark, args.period)
-        benchmark_ratios[benchmark] = calculate_valuation_ratios(benchmark_data)
-    
-    # Fetch market index data
-    market_data = None
-    market_ratios = None
+    # Fetch the company, benchmarks and market index concurrently; each fetch is network-bound
+    tickers = [args.ticker, *args.benchmark]
     if args.market_index:
-        print(f"Fetching data for market index: {args.market_index}")
-        try:
-            market_data = fetch_financial_data(args.market_index, args.period)
-            market_ratios = calculate_valuation_ratios(market_data)
-        except Exception as e:
-            print(f"Warning: Failed to fetch market index data: {e}")
+        tickers.append(args.market_index)
+    tickers = list(dict.fromkeys(tickers))
+    with ThreadPoolExecutor(max_workers=min(8, len(tickers))) as executor:
+        futures = {ticker: executor.submit(fetch_financial_data, ticker, args.period) for ticker in tickers}
+        
+        # Data for the main company
+        company_data = futures[args.ticker].result()
+        company_ratios = calculate_valuation_ratios(company_data)
+        
+        # Data for benchmark companies
+        benchmark_ratios = {}
+        for benchmark in args.benchmark:
+            print(f"Fetching data for benchmark company: {benchmark}")
+            benchmark_data = futures[benchmark].result()
+            benchmark_ratios[benchmark] = calculate_valuation_ratios(benchmark_data)
+        
+        # Data for the market index
+        market_ratios = None
+        if args.market_index:
+            print(f"Fetching data for market index: {args.market_index}")
+            try:
+                market_data = futures[args.market_index].result()
+                market_ratios = calculate_valuation_ratios(market_data)
+            except Exception as e:
+                print(f"Warning: Failed to fetch market index data: {e}")
     
     # Plot trend graphs
     print("Generating trend graphs...")
@@ -0,0 +1,133 @@
+"""
+yfinance Disk Cache
+
+This module memoizes yfinance requests on disk so repeated runs of the ratio
+scripts for the same ticker and period do not go back to the network.
+
+Entries are pickled under CACHE_DIR, keyed by the request name and its
+arguments. Price ranges ending today expire after TODAY_TTL seconds; ticker
+statements, dividends and info expire after INFO_TTL seconds.
+
+Usage:
+    import yf_cache
+    stock_data = yf_cache.download("TCS.NS", start_date, end_date)
+"""
+
+import os
+import pickle
+import hashlib
+import time
+import threading
+from datetime import date
+
+import pandas as pd
+import yfinance as yf
+
+# Location of the cache; override with the FINANALYST_CACHE_DIR environment variable
+CACHE_DIR = os.environ.get("FINANALYST_CACHE_DIR", "./.yf_cache")
+
+# Price ranges that end today are still changing, so refresh them hourly
+TODAY_TTL = 60 * 60
+
+# Statements, dividends and company info change rarely
+INFO_TTL = 24 * 60 * 60
+
+# yf.download keeps its results in module-level state, so concurrent downloads take turns
+_download_lock = threading.Lock()
+
+def _cache_path(name, key):
+    """Return the file path for a cache entry."""
+    digest = hashlib.sha1(repr((name,) + tuple(key)).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{name}_{digest}.pkl")
+
+def _is_empty(result):
+    """Return True for results that should not be cached: None or an empty frame, series or dict."""
+    if result is None:
+        return True
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.empty
+    if isinstance(result, dict):
+        return not result
+    return False
+
+def cached_call(name, key, fetch, ttl=None):
+    """
+    Return the cached result for a request, calling fetch on a miss.
+
+    Args:
+        name: Name of the request, used as the file prefix
+        key: Tuple of strings identifying the request
+        fetch: Zero-argument callable performing the request
+        ttl: Maximum age of the entry in seconds, or None to never expire
+
+    Returns:
+        Result of fetch, from disk when a fresh entry exists
+    """
+    path = _cache_path(name, key)
+
+    if os.path.exists(path) and (ttl is None or time.time() - os.path.getmtime(path) < ttl):
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # Unreadable entry (partial write, library upgrade); fetch it again
+            pass
+
+    result = fetch()
+
+    # yfinance reports failed requests as empty results rather than raising;
+    # don't keep those around, so the next call tries the network again
+    if _is_empty(result):
+        return result
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Write to a per-thread temporary file and rename it into place, so concurrent
+    # fetches of the same entry never read a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(result, f)
+    os.replace(tmp_path, path)
+
+    return result
+
+def download(ticker, start_date, end_date, **kwargs):
+    """
+    Cached yf.download for one or more tickers.
+
+    Args:
+        ticker: Ticker symbol, or a list of symbols for a batched download
+        start_date: Start of the price range
+        end_date: End of the price range
+        **kwargs: Extra keyword arguments passed to yf.download
+
+    Returns:
+        DataFrame of price history
+    """
+    # Key on calendar dates so runs later on the same day share an entry
+    start_key = start_date.date().isoformat()
+    end_key = end_date.date().isoformat()
+    ttl = TODAY_TTL if end_date.date() >= date.today() else None
+    symbols = ticker if isinstance(ticker, str) else ",".join(ticker)
+    key = (symbols, start_key, end_key) + tuple(f"{k}={v!r}" for k, v in sorted(kwargs.items()))
+
+    def fetch():
+        with _download_lock:
+            return yf.download(ticker, start=start_date, end=end_date, **kwargs)
+
+    return cached_call("download", key, fetch, ttl=ttl)
+
+def financials(ticker):
+    """Cached annual income statement for a ticker."""
+    return cached_call("financials", (ticker,), lambda: yf.Ticker(ticker).financials, ttl=INFO_TTL)
+
+def balance_sheet(ticker):
+    """Cached annual balance sheet for a ticker."""
+    return cached_call("balance_sheet", (ticker,), lambda: yf.Ticker(ticker).balance_sheet, ttl=INFO_TTL)
+
+def dividends(ticker):
+    """Cached dividend history for a ticker."""
+    return cached_call("dividends", (ticker,), lambda: yf.Ticker(ticker).dividends, ttl=INFO_TTL)
+
+def info(ticker):
+    """Cached info dictionary for a ticker."""
+    return cached_call("info", (ticker,), lambda: yf.Ticker(ticker).info, ttl=INFO_TTL)